@@ -7,6 +7,7 @@ import psycopg_pool
 import redis
 from aiogram import BaseMiddleware, Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
 from aiogram.enums import ParseMode
 from aiogram.filters import ExceptionTypeFilter
 from aiogram.fsm.storage.base import DefaultKeyBuilder
@@ -23,6 +24,7 @@ from app.bot.middlewares.get_user import GetUserMiddleware
 from app.bot.middlewares.shadow_ban import ShadowBanMiddleware
 from app.bot.middlewares.i18n import TranslatorRunnerMiddleware
 from app.bot.middlewares.registration_guard import RegistrationGuardMiddleware
+from app.bot.middlewares.request_limit import RequestConcurrencyMiddleware
 from app.bot.i18n.translator_hub import create_translator_hub
 from fluentogram import TranslatorHub
 from app.infrastructure.cache.connect_to_redis import get_redis_pool
@@ -36,6 +38,7 @@ from app.services.delay_service.start_consumer import start_delayed_consumer
 from app.services.scheduler.taskiq_broker import broker, redis_source
 from app.services.i18n.bootstrap import ensure_languages, load_translations
 from app.bot.handlers.comitee import rebuild_menu_texts
+from app.bot.handlers.comitee_courts import flush_all_mediate_logs
 from app.bot.keyboards.menu_button import get_main_menu_commands
 from config.config import settings
 from app.bot.enums.roles import UserRole
@@ -123,10 +126,16 @@ async def main():
     else:
         storage = MemoryStorage()
 
+    telegram_max_concurrent = _as_int(
+        getattr(settings.bot, "telegram_max_concurrent_requests", 30), 30
+    )
     bot = Bot(
         token=settings.bot_token,
+        # Keep-alive pool sized to the request cap so fan-outs reuse warm connections.
+        session=AiohttpSession(limit=telegram_max_concurrent),
         default=DefaultBotProperties(parse_mode=ParseMode(settings.bot.parse_mode)),
     )
+    bot.session.middleware(RequestConcurrencyMiddleware(telegram_max_concurrent))
     dp = Dispatcher(storage=storage)
     runtime_state: dict[str, float | int] = {
         "started_monotonic": time.monotonic(),
@@ -652,6 +661,7 @@ async def main():
         if nc is not None:
             await nc.close()
             logger.info("Connection to NATS closed")
+        await flush_all_mediate_logs(db_pool)
         await db_pool.close()
         logger.info("Connection to Postgres closed")
         await broker.shutdown()
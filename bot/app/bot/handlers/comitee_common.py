@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import json
 import logging
+import time
 from datetime import date
+from functools import lru_cache
 from typing import Any, Optional
 
 from aiogram import types
@@ -13,8 +16,24 @@ from app.services.backend import BackendDocumentsClient
 from app.services.i18n.localization import get_text, resolve_language
 from config.config import settings
 
+try:
+    import orjson
+except ImportError:  # optional speedup, stdlib json is used without it
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# A failed get_me is retried after this many seconds instead of sticking forever.
+_BOT_USERNAME_RETRY_SEC = 60.0
+_bot_usernames: dict[int, tuple[str | None, float]] = {}
+
+
+def loads_json(raw: str | bytes) -> Any:
+    """Parse JSON with orjson when installed; errors subclass json.JSONDecodeError either way."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
 
 def user_language(user_row: Optional[UserModel], telegram_user: types.User) -> str:
     return resolve_language(
@@ -64,6 +83,7 @@ def admin_ids() -> list[int]:
     return result
 
 
+@lru_cache(maxsize=1)
 def scholars_group_id() -> int:
     try:
         value = getattr(settings.bot, "SCHOLARS_GROUP_ID", None)
@@ -74,6 +94,24 @@ def scholars_group_id() -> int:
         return 0
 
 
+async def resolve_bot_username(bot: types.Bot) -> str | None:
+    username = getattr(bot, "username", None)
+    if username:
+        return username
+    # The username is fixed for the bot's lifetime, so get_me runs once per bot.
+    bot_id = getattr(bot, "id", 0)
+    cached = _bot_usernames.get(bot_id)
+    if cached is not None and (cached[0] or time.monotonic() < cached[1]):
+        return cached[0]
+    try:
+        me = await bot.get_me()
+        username = getattr(me, "username", None)
+    except Exception:
+        username = None
+    _bot_usernames[bot_id] = (username, time.monotonic() + _BOT_USERNAME_RETRY_SEC)
+    return username
+
+
 async def safe_state_clear(state: FSMContext) -> None:
     try:
         await state.clear()
@@ -81,6 +119,12 @@ async def safe_state_clear(state: FSMContext) -> None:
         logger.debug("Failed to clear FSM state", exc_info=True)
 
 
+async def restart_state(state: FSMContext, new_state: Any, **data: Any) -> None:
+    """Replace the FSM data and state in two storage writes instead of clear + set + update."""
+    await state.set_data(data)
+    await state.set_state(new_state)
+
+
 def today_iso() -> str:
     return date.today().isoformat()
 
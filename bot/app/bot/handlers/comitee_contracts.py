@@ -1,12 +1,15 @@
 ﻿
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import io
 import logging
 import math
 import os
 import re
 import uuid
+from collections import OrderedDict
 from secrets import choice as secrets_choice
 from datetime import datetime, timezone
 from xml.sax.saxutils import escape
@@ -45,6 +48,16 @@ from app.bot.states.comitee import (
 from app.infrastructure.database.db import DB
 from app.infrastructure.database.models.user import UserModel
 from app.services.i18n.localization import get_text, resolve_language
+from app.services.scholar_requests.service import (
+    ScholarAttachment,
+    ScholarRequestDraft,
+    build_forward_text,
+    build_request_payload,
+    build_request_summary,
+    forward_request_to_group,
+    new_request_id,
+    persist_request_to_documents,
+)
 from app.services.work_items.service import create_work_item
 from config.config import settings
 
@@ -52,6 +65,7 @@ from .comitee_common import (
     edit_or_send_callback,
     get_backend_client,
     is_cancel_command,
+    resolve_bot_username,
     send_documents,
     user_language,
 )
@@ -66,6 +80,9 @@ _PDF_FONT_REGULAR: str | None = None
 _PDF_FONT_BOLD: str | None = None
 _PDF_FONT_ITALIC: str | None = None
 _PDF_FONT_SYMBOL: str | None = None
+# LRU of rendered contract PDFs keyed by (sha256(text), title); repeat sends skip ReportLab.
+_PDF_CACHE: OrderedDict[tuple[bytes, str], bytes] = OrderedDict()
+_PDF_CACHE_SIZE = 64
 
 _STATUS_KEY_BY_VALUE: dict[str, str] = {
     "draft": "contracts.status.draft",
@@ -96,6 +113,10 @@ def _format_contract_status(status: str | None, lang_code: str) -> str:
     return get_text(key, lang_code) if key else status
 
 
+async def _answer_invalid_request(message: Message, lang_code: str) -> None:
+    await message.answer(get_text("error.request.invalid", lang_code))
+
+
 def _format_contract_date(value: object) -> str:
     if value is None:
         return "-"
@@ -212,17 +233,6 @@ def _generate_invite_code() -> str:
     return "".join(secrets_choice(alphabet) for _ in range(_INVITE_CODE_LENGTH))
 
 
-async def _resolve_bot_username(bot: types.Bot) -> str | None:
-    username = getattr(bot, "username", None)
-    if username:
-        return username
-    try:
-        me = await bot.get_me()
-        return getattr(me, "username", None)
-    except Exception:
-        return None
-
-
 def _ensure_pdf_fonts() -> tuple[Optional[str], Optional[str], Optional[str], Optional[str]]:
     global _PDF_FONTS_READY, _PDF_FONT_REGULAR, _PDF_FONT_BOLD, _PDF_FONT_ITALIC, _PDF_FONT_SYMBOL
     if _PDF_FONTS_READY:
@@ -1320,6 +1330,15 @@ def _contract_title(contract_slug: str, lang_code: str) -> str:
     return get_text(str(definition.get("title_key") or contract_slug), lang_code)
 
 
+def _stored_contract_title(contract: dict[str, object], contract_slug: str, lang_code: str) -> str:
+    title = str(contract.get("template_topic") or "")
+    if not title:
+        title = _contract_title(contract_slug, lang_code) or get_text(
+            "contracts.title.unknown", lang_code
+        )
+    return title
+
+
 def _find_next_field_index(
     fields: list[dict[str, object]],
     start_index: int,
@@ -1530,6 +1549,19 @@ def _build_contract_story(
 
 
 def _build_contract_pdf(text: str, title: str) -> bytes:
+    key = (hashlib.sha256(text.encode("utf-8")).digest(), title)
+    cached = _PDF_CACHE.get(key)
+    if cached is not None:
+        _PDF_CACHE.move_to_end(key)
+        return cached
+    pdf_bytes = _render_contract_pdf(text, title)
+    _PDF_CACHE[key] = pdf_bytes
+    if len(_PDF_CACHE) > _PDF_CACHE_SIZE:
+        _PDF_CACHE.popitem(last=False)
+    return pdf_bytes
+
+
+def _render_contract_pdf(text: str, title: str) -> bytes:
     buffer = io.BytesIO()
     regular_font, bold_font, italic_font, symbol_font = _ensure_pdf_fonts()
     regular_name = regular_font or "Helvetica"
@@ -2063,7 +2095,7 @@ async def _start_contract_flow(
         if isinstance(target, CallbackQuery):
             await target.answer(get_text("error.request.invalid", lang_code), show_alert=True)
         else:
-            await target.answer(get_text("error.request.invalid", lang_code))
+            await _answer_invalid_request(target, lang_code)
         return
 
     await state.set_state(ContractTemplateFlow.waiting_for_field)
@@ -2133,7 +2165,7 @@ async def handle_contract_auto_answer(
     await callback.answer()
     parts = (callback.data or "").split(":", 2)
     if len(parts) != 3:
-        await callback.message.answer(get_text("error.request.invalid", lang_code))
+        await _answer_invalid_request(callback.message, lang_code)
         return
     _, key, value = parts
     data = await state.get_data()
@@ -2240,7 +2272,7 @@ async def handle_contract_choice(
     field_index = int(data.get("field_index") or 0)
     field_data = dict(data.get("field_data") or {})
     if not contract_slug or field_index >= len(fields):
-        await callback.message.answer(get_text("error.request.invalid", lang_code))
+        await _answer_invalid_request(callback.message, lang_code)
         return
     field = fields[field_index]
     normalized, error = _validate_contract_value(contract_slug, field, value, lang_code, field_data)
@@ -2267,7 +2299,7 @@ async def handle_contract_field_skip(
     field_index = int(data.get("field_index") or 0)
     field_data = dict(data.get("field_data") or {})
     if field_index >= len(fields):
-        await callback.message.answer(get_text("error.request.invalid", lang_code))
+        await _answer_invalid_request(callback.message, lang_code)
         return
     field = fields[field_index]
     if not field.get("optional"):
@@ -2298,7 +2330,7 @@ async def handle_contract_field(
     field_index = int(data.get("field_index") or 0)
     field_data = dict(data.get("field_data") or {})
     if not contract_slug or field_index >= len(fields):
-        await message.answer(get_text("error.request.invalid", lang_code))
+        await _answer_invalid_request(message, lang_code)
         return
 
     field = fields[field_index]
@@ -2331,7 +2363,7 @@ async def handle_contract_generate(
     topic = str(data.get("contract_topic") or "")
     field_data = dict(data.get("field_data") or {})
     if not contract_slug or not topic:
-        await callback.message.answer(get_text("error.request.invalid", lang_code))
+        await _answer_invalid_request(callback.message, lang_code)
         return
 
     backend_client = get_backend_client(callback.bot)
@@ -2407,7 +2439,7 @@ async def handle_contract_actions(
     await callback.answer()
     data = await state.get_data()
     if not data.get("rendered_text"):
-        await callback.message.answer(get_text("error.request.invalid", lang_code))
+        await _answer_invalid_request(callback.message, lang_code)
         return
     await state.set_state(ContractTemplateFlow.preview)
     await _show_contract_actions(callback.message, lang_code, db=db, state=state)
@@ -2425,7 +2457,7 @@ async def handle_contract_send_court(
     data = await state.get_data()
     contract_id = data.get("contract_id")
     if not contract_id:
-        await callback.message.answer(get_text("error.request.invalid", lang_code))
+        await _answer_invalid_request(callback.message, lang_code)
         return
     contract = await db.contracts.get_contract(contract_id=int(contract_id))
     if not _is_contract_fully_signed(contract):
@@ -2492,7 +2524,7 @@ async def handle_contract_confirm(
     contract_title = str(data.get("contract_title") or contract_slug)
     contract_id = data.get("contract_id")
     if not rendered_text:
-        await callback.message.answer(get_text("error.request.invalid", lang_code))
+        await _answer_invalid_request(callback.message, lang_code)
         return
 
     try:
@@ -2554,7 +2586,7 @@ async def handle_contract_edit(
     data = await state.get_data()
     contract_slug = str(data.get("contract_type") or "")
     if not contract_slug:
-        await callback.message.answer(get_text("error.request.invalid", lang_code))
+        await _answer_invalid_request(callback.message, lang_code)
         return
     await state.update_data(field_index=0, field_data={}, rendered_text="")
     await state.set_state(ContractTemplateFlow.waiting_for_field)
@@ -2572,7 +2604,7 @@ async def handle_contract_download_txt(
     rendered_text = str(data.get("rendered_text") or "")
     contract_slug = str(data.get("contract_type") or "contract")
     if not rendered_text:
-        await callback.message.answer(get_text("error.request.invalid", lang_code))
+        await _answer_invalid_request(callback.message, lang_code)
         return
 
     filename = f"{contract_slug}.txt"
@@ -2593,7 +2625,7 @@ async def handle_contract_download_pdf(
     contract_slug = str(data.get("contract_type") or "contract")
     contract_title = str(data.get("contract_title") or contract_slug)
     if not rendered_text:
-        await callback.message.answer(get_text("error.request.invalid", lang_code))
+        await _answer_invalid_request(callback.message, lang_code)
         return
 
     try:
@@ -2616,7 +2648,7 @@ async def handle_contract_send_other(
     await callback.answer()
     data = await state.get_data()
     if not data.get("rendered_text"):
-        await callback.message.answer(get_text("error.request.invalid", lang_code))
+        await _answer_invalid_request(callback.message, lang_code)
         return
     await state.set_state(ContractTemplateFlow.waiting_for_recipient)
     await callback.message.answer(
@@ -2663,7 +2695,7 @@ async def _send_contract_invite(
         return
     await db.contracts.set_invite_code(contract_id=contract_id, invite_code=invite_code)
 
-    username = await _resolve_bot_username(message.bot)
+    username = await resolve_bot_username(message.bot)
     if username:
         invite_link = f"https://t.me/{username}?start={invite_code}"
         await message.answer(
@@ -2736,12 +2768,12 @@ async def handle_contract_send_other_recipient(
     contract_id = data.get("contract_id")
     field_data = dict(data.get("field_data") or {})
     if not rendered_text:
-        await message.answer(get_text("error.request.invalid", lang_code))
+        await _answer_invalid_request(message, lang_code)
         return
     if not contract_id:
         contract_topic = str(data.get("contract_topic") or "")
         if not contract_topic:
-            await message.answer(get_text("error.request.invalid", lang_code))
+            await _answer_invalid_request(message, lang_code)
             return
         try:
             contract_id = await db.contracts.add_contract(
@@ -2756,10 +2788,10 @@ async def handle_contract_send_other_recipient(
             await state.update_data(contract_id=contract_id)
         except Exception:
             logger.exception("Failed to persist contract draft before send")
-            await message.answer(get_text("error.request.invalid", lang_code))
+            await _answer_invalid_request(message, lang_code)
             return
         if not contract_id:
-            await message.answer(get_text("error.request.invalid", lang_code))
+            await _answer_invalid_request(message, lang_code)
             return
 
     sender_name = (user_row.full_name if user_row else None) or message.from_user.full_name
@@ -2885,12 +2917,12 @@ async def handle_contract_send_other_user_shared(
     contract_id = data.get("contract_id")
     field_data = dict(data.get("field_data") or {})
     if not rendered_text:
-        await message.answer(get_text("error.request.invalid", lang_code))
+        await _answer_invalid_request(message, lang_code)
         return
     if not contract_id:
         contract_topic = str(data.get("contract_topic") or "")
         if not contract_topic:
-            await message.answer(get_text("error.request.invalid", lang_code))
+            await _answer_invalid_request(message, lang_code)
             return
         try:
             contract_id = await db.contracts.add_contract(
@@ -2905,10 +2937,10 @@ async def handle_contract_send_other_user_shared(
             await state.update_data(contract_id=contract_id)
         except Exception:
             logger.exception("Failed to persist contract draft before send")
-            await message.answer(get_text("error.request.invalid", lang_code))
+            await _answer_invalid_request(message, lang_code)
             return
         if not contract_id:
-            await message.answer(get_text("error.request.invalid", lang_code))
+            await _answer_invalid_request(message, lang_code)
             return
 
     sender_name = (user_row.full_name if user_row else None) or message.from_user.full_name
@@ -3164,6 +3196,55 @@ async def handle_contract_party_comment(
     await state.clear()
 
 
+def _build_contract_scholar_attachments(
+    rendered_text: str,
+    contract_slug: str,
+    contract_title: str,
+) -> list[ScholarAttachment]:
+    attachments = [
+        ScholarAttachment(
+            content=rendered_text.encode("utf-8"),
+            filename=f"{contract_slug}.txt",
+            content_type="text/plain",
+        )
+    ]
+    try:
+        pdf_bytes = _build_contract_pdf(rendered_text, contract_title)
+    except Exception:
+        logger.exception("Failed to build PDF for scholar request")
+        pdf_bytes = b""
+    if pdf_bytes:
+        attachments.append(
+            ScholarAttachment(
+                content=pdf_bytes,
+                filename=f"{contract_slug}.pdf",
+                content_type="application/pdf",
+            )
+        )
+    return attachments
+
+
+async def _persist_contract_scholar_request(
+    db: DB,
+    *,
+    request_id: int,
+    user_id: int,
+    payload: dict[str, object],
+    attachments: list[ScholarAttachment],
+) -> None:
+    # Swallow errors so a failed insert does not cancel the sibling forward task.
+    try:
+        await persist_request_to_documents(
+            db,
+            request_id=request_id,
+            user_id=user_id,
+            payload=payload,
+            attachments=attachments,
+        )
+    except Exception:
+        logger.exception("Failed to persist contract scholar request")
+
+
 @router.callback_query(F.data == "contract_send_scholar")
 async def handle_contract_send_scholar(
     callback: CallbackQuery,
@@ -3179,42 +3260,12 @@ async def handle_contract_send_scholar(
     contract_title = str(data.get("contract_title") or contract_slug)
     contract_id = data.get("contract_id")
     if not rendered_text:
-        await callback.message.answer(get_text("error.request.invalid", lang_code))
+        await _answer_invalid_request(callback.message, lang_code)
         return
 
-    from app.services.scholar_requests.service import (
-        ScholarAttachment,
-        ScholarRequestDraft,
-        build_forward_text,
-        build_request_payload,
-        build_request_summary,
-        forward_request_to_group,
-        persist_request_to_documents,
-    )
-
-    pdf_bytes = b""
-    try:
-        pdf_bytes = _build_contract_pdf(rendered_text, contract_title)
-    except Exception:
-        logger.exception("Failed to build PDF for scholar request")
+    attachments = _build_contract_scholar_attachments(rendered_text, contract_slug, contract_title)
 
-    attachments = [
-        ScholarAttachment(
-            content=rendered_text.encode("utf-8"),
-            filename=f"{contract_slug}.txt",
-            content_type="text/plain",
-        )
-    ]
-    if pdf_bytes:
-        attachments.append(
-            ScholarAttachment(
-                content=pdf_bytes,
-                filename=f"{contract_slug}.pdf",
-                content_type="application/pdf",
-            )
-        )
-
-    request_id = uuid.uuid4().int % 100000
+    request_id = new_request_id()
     draft = ScholarRequestDraft(
         request_type="docs",
         data={"ask_docs_description": contract_title, "context": "contracts"},
@@ -3232,24 +3283,26 @@ async def handle_contract_send_scholar(
         telegram_user=callback.from_user,
         summary=summary,
     )
-    try:
-        await persist_request_to_documents(
-            db,
-            request_id=request_id,
-            user_id=callback.from_user.id,
-            payload=payload,
-            attachments=attachments,
+    async with asyncio.TaskGroup() as tg:
+        tg.create_task(
+            _persist_contract_scholar_request(
+                db,
+                request_id=request_id,
+                user_id=callback.from_user.id,
+                payload=payload,
+                attachments=attachments,
+            )
         )
-    except Exception:
-        logger.exception("Failed to persist contract scholar request")
-
-    ok = await forward_request_to_group(
-        callback.bot,
-        request_id=request_id,
-        user_id=callback.from_user.id,
-        text=forward_text,
-        attachments=attachments,
-    )
+        forward_task = tg.create_task(
+            forward_request_to_group(
+                callback.bot,
+                request_id=request_id,
+                user_id=callback.from_user.id,
+                text=forward_text,
+                attachments=attachments,
+            )
+        )
+    ok = forward_task.result()
     await callback.message.answer(
         get_text("contracts.flow.send_scholar.sent", lang_code)
         if ok
@@ -3257,12 +3310,14 @@ async def handle_contract_send_scholar(
     )
 
     if contract_id:
-        contract_payload = dict(data.get("field_data") or {})
-        contract_payload["scholar_request_id"] = request_id
-        contract_payload["scholar_sent_at"] = datetime.now(timezone.utc).isoformat()
-        contract_payload["scholar_send_ok"] = bool(ok)
-        contract_payload["scholar_summary"] = summary
-        contract_payload["scholar_forward_text"] = forward_text
+        contract_payload = {
+            **(data.get("field_data") or {}),
+            "scholar_request_id": request_id,
+            "scholar_sent_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "scholar_send_ok": bool(ok),
+            "scholar_summary": summary,
+            "scholar_forward_text": forward_text,
+        }
         contract_status = "sent_to_scholar" if ok else "scholar_send_failed"
         try:
             await db.contracts.update_contract(
@@ -3304,18 +3359,19 @@ async def handle_contract_delete(
     data = await state.get_data()
     contract_id = data.get("contract_id")
     if not contract_id:
-        await callback.message.answer(get_text("error.request.invalid", lang_code))
+        await _answer_invalid_request(callback.message, lang_code)
         return
-    contract = await db.contracts.get_contract(contract_id=int(contract_id))
+    cid = int(contract_id)
+    contract = await db.contracts.get_contract(contract_id=cid)
     if _is_contract_counterparty_signed(contract):
-        await callback.message.answer(get_text("error.request.invalid", lang_code))
+        await _answer_invalid_request(callback.message, lang_code)
         return
     try:
-        await db.documents.delete_by_contract_id(contract_id=int(contract_id))
-        await db.contracts.delete_contract(contract_id=int(contract_id))
+        await db.documents.delete_by_contract_id(contract_id=cid)
+        await db.contracts.delete_contract(contract_id=cid)
     except Exception:
         logger.exception("Failed to delete contract %s", contract_id)
-        await callback.message.answer(get_text("error.request.invalid", lang_code))
+        await _answer_invalid_request(callback.message, lang_code)
         return
     await state.clear()
     await callback.message.answer(
@@ -3335,31 +3391,28 @@ async def handle_contract_list_send_other(
     contract_id = (callback.data or "").split(":", 1)[-1].strip()
     await callback.answer()
     if not contract_id.isdigit():
-        await callback.message.answer(get_text("error.request.invalid", lang_code))
+        await _answer_invalid_request(callback.message, lang_code)
         return
-    contract = await db.contracts.get_contract(contract_id=int(contract_id))
+    cid = int(contract_id)
+    contract = await db.contracts.get_contract(contract_id=cid)
     if not contract:
-        await callback.message.answer(get_text("error.request.invalid", lang_code))
+        await _answer_invalid_request(callback.message, lang_code)
         return
     if int(contract.get("user_id") or 0) != callback.from_user.id:
-        await callback.message.answer(get_text("error.request.invalid", lang_code))
+        await _answer_invalid_request(callback.message, lang_code)
         return
     rendered_text = str(contract.get("rendered_text") or "")
     if not rendered_text:
-        await callback.message.answer(get_text("error.request.invalid", lang_code))
+        await _answer_invalid_request(callback.message, lang_code)
         return
     contract_slug = str(contract.get("type") or "contract")
-    contract_title = (
-        str(contract.get("template_topic") or "")
-        or _contract_title(contract_slug, lang_code)
-        or get_text("contracts.title.unknown", lang_code)
-    )
+    contract_title = _stored_contract_title(contract, contract_slug, lang_code)
     await state.set_state(ContractTemplateFlow.waiting_for_recipient)
     await state.update_data(
         rendered_text=rendered_text,
         contract_type=contract_slug,
         contract_title=contract_title,
-        contract_id=int(contract_id),
+        contract_id=cid,
         field_data=dict(contract.get("data") or {}),
     )
     await callback.message.answer(get_text("contracts.flow.send_other.prompt", lang_code))
@@ -3379,57 +3432,24 @@ async def handle_contract_list_send_scholar(
     contract_id = (callback.data or "").split(":", 1)[-1].strip()
     await callback.answer()
     if not contract_id.isdigit():
-        await callback.message.answer(get_text("error.request.invalid", lang_code))
+        await _answer_invalid_request(callback.message, lang_code)
         return
-    contract = await db.contracts.get_contract(contract_id=int(contract_id))
+    cid = int(contract_id)
+    contract = await db.contracts.get_contract(contract_id=cid)
     if not contract:
-        await callback.message.answer(get_text("error.request.invalid", lang_code))
+        await _answer_invalid_request(callback.message, lang_code)
         return
     rendered_text = str(contract.get("rendered_text") or "")
     if not rendered_text:
-        await callback.message.answer(get_text("error.request.invalid", lang_code))
+        await _answer_invalid_request(callback.message, lang_code)
         return
 
     contract_slug = str(contract.get("type") or "contract")
-    contract_title = (
-        str(contract.get("template_topic") or "")
-        or _contract_title(contract_slug, lang_code)
-        or get_text("contracts.title.unknown", lang_code)
-    )
+    contract_title = _stored_contract_title(contract, contract_slug, lang_code)
 
-    from app.services.scholar_requests.service import (
-        ScholarAttachment,
-        ScholarRequestDraft,
-        build_forward_text,
-        build_request_payload,
-        build_request_summary,
-        forward_request_to_group,
-        persist_request_to_documents,
-    )
+    attachments = _build_contract_scholar_attachments(rendered_text, contract_slug, contract_title)
 
-    pdf_bytes = b""
-    try:
-        pdf_bytes = _build_contract_pdf(rendered_text, contract_title)
-    except Exception:
-        logger.exception("Failed to build PDF for scholar request")
-
-    attachments = [
-        ScholarAttachment(
-            content=rendered_text.encode("utf-8"),
-            filename=f"{contract_slug}.txt",
-            content_type="text/plain",
-        )
-    ]
-    if pdf_bytes:
-        attachments.append(
-            ScholarAttachment(
-                content=pdf_bytes,
-                filename=f"{contract_slug}.pdf",
-                content_type="application/pdf",
-            )
-        )
-
-    request_id = uuid.uuid4().int % 100000
+    request_id = new_request_id()
     draft = ScholarRequestDraft(
         request_type="docs",
         data={"ask_docs_description": contract_title, "context": "contracts"},
@@ -3447,40 +3467,44 @@ async def handle_contract_list_send_scholar(
         telegram_user=callback.from_user,
         summary=summary,
     )
-    try:
-        await persist_request_to_documents(
-            db,
-            request_id=request_id,
-            user_id=callback.from_user.id,
-            payload=payload,
-            attachments=attachments,
+    async with asyncio.TaskGroup() as tg:
+        tg.create_task(
+            _persist_contract_scholar_request(
+                db,
+                request_id=request_id,
+                user_id=callback.from_user.id,
+                payload=payload,
+                attachments=attachments,
+            )
         )
-    except Exception:
-        logger.exception("Failed to persist contract scholar request")
-
-    ok = await forward_request_to_group(
-        callback.bot,
-        request_id=request_id,
-        user_id=callback.from_user.id,
-        text=forward_text,
-        attachments=attachments,
-    )
+        forward_task = tg.create_task(
+            forward_request_to_group(
+                callback.bot,
+                request_id=request_id,
+                user_id=callback.from_user.id,
+                text=forward_text,
+                attachments=attachments,
+            )
+        )
+    ok = forward_task.result()
     await callback.message.answer(
         get_text("contracts.flow.send_scholar.sent", lang_code)
         if ok
         else get_text("contracts.flow.send_scholar.failed", lang_code)
     )
 
-    contract_payload = dict(contract.get("data") or {})
-    contract_payload["scholar_request_id"] = request_id
-    contract_payload["scholar_sent_at"] = datetime.now(timezone.utc).isoformat()
-    contract_payload["scholar_send_ok"] = bool(ok)
-    contract_payload["scholar_summary"] = summary
-    contract_payload["scholar_forward_text"] = forward_text
+    contract_payload = {
+        **(contract.get("data") or {}),
+        "scholar_request_id": request_id,
+        "scholar_sent_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "scholar_send_ok": bool(ok),
+        "scholar_summary": summary,
+        "scholar_forward_text": forward_text,
+    }
     contract_status = "sent_to_scholar" if ok else "scholar_send_failed"
     try:
         await db.contracts.update_contract(
-            contract_id=int(contract_id),
+            contract_id=cid,
             status=contract_status,
             rendered_text=rendered_text,
             data=contract_payload,
@@ -3495,7 +3519,7 @@ async def handle_contract_list_send_scholar(
             target_user_id=callback.from_user.id,
             created_by_user_id=callback.from_user.id,
             payload={
-                "contract_id": int(contract_id),
+                "contract_id": cid,
                 "contract_title": contract_title,
                 "contract_type": contract_slug,
                 "status": contract_status,
@@ -3515,16 +3539,17 @@ async def handle_contract_list_edit(
     contract_id = (callback.data or "").split(":", 1)[-1].strip()
     await callback.answer()
     if not contract_id.isdigit():
-        await callback.message.answer(get_text("error.request.invalid", lang_code))
+        await _answer_invalid_request(callback.message, lang_code)
         return
-    contract = await db.contracts.get_contract(contract_id=int(contract_id))
+    cid = int(contract_id)
+    contract = await db.contracts.get_contract(contract_id=cid)
     if not contract:
-        await callback.message.answer(get_text("error.request.invalid", lang_code))
+        await _answer_invalid_request(callback.message, lang_code)
         return
     contract_slug = str(contract.get("type") or "contract")
     definition = CONTRACT_FLOW_DEFINITIONS.get(contract_slug)
     if not definition:
-        await callback.message.answer(get_text("error.request.invalid", lang_code))
+        await _answer_invalid_request(callback.message, lang_code)
         return
     rendered_text = str(contract.get("rendered_text") or "")
     await state.set_state(ContractTemplateFlow.preview)
@@ -3539,7 +3564,7 @@ async def handle_contract_list_edit(
         field_index=0,
         field_data=dict(contract.get("data") or {}),
         rendered_text=rendered_text,
-        contract_id=int(contract_id),
+        contract_id=cid,
     )
     await _show_contract_actions(callback.message, lang_code, db=db, state=state)
 
@@ -3579,23 +3604,12 @@ async def handle_all_contracts(
         return
 
     await callback.message.answer(get_text("contracts.list.title", lang_code))
-    contract_index: dict[str, dict[str, object]] = {}
-    contract_id_index: dict[int, dict[str, object]] = {}
+    contract_id_index: dict[int, dict[str, object]] = {
+        contract["id"]: contract for contract in contracts if isinstance(contract.get("id"), int)
+    }
+    # Title lookup is only needed for legacy documents without contract_id.
+    contract_index: dict[str, dict[str, object]] | None = None
     counterparty_name_cache: dict[int, str | None] = {}
-    for contract in contracts:
-        data = contract.get("data") or {}
-        contract_slug = str(contract.get("type") or "contract")
-        title = (
-            data.get("contract_title")
-            or contract.get("template_topic")
-            or _contract_title(contract_slug, lang_code)
-            or get_text("contracts.title.unknown", lang_code)
-        )
-        if title:
-            contract_index[title.strip().lower()] = contract
-        contract_id_value = contract.get("id")
-        if isinstance(contract_id_value, int):
-            contract_id_index[contract_id_value] = contract
 
     for doc in documents:
         content = doc.get("content")
@@ -3607,7 +3621,15 @@ async def handle_all_contracts(
         if isinstance(doc_contract_id, int):
             contract = contract_id_index.get(doc_contract_id)
         if contract is None and name:
-            contract = contract_index.get(name.lower())
+            if contract_index is None:
+                contract_index = {}
+                for item in contracts:
+                    title = (item.get("data") or {}).get("contract_title") or _stored_contract_title(
+                        item, str(item.get("type") or "contract"), lang_code
+                    )
+                    if title:
+                        contract_index[title.strip().casefold()] = item
+            contract = contract_index.get(name.casefold())
         if contract:
             data = contract.get("data") or {}
             status_text = _format_contract_status(contract.get("status"), lang_code)
@@ -3711,11 +3733,11 @@ async def handle_contract_search_query(
         await message.answer(get_text("error.contracts.search.empty", lang_code))
         return
 
-    documents = await db.documents.get_user_documents_by_type(
+    filtered = await db.documents.search_user_documents_by_name(
         user_id=message.from_user.id,
         doc_type="Contract",
+        pattern=query,
     )
-    filtered = [doc for doc in documents if query.lower() in (doc.get("name", "") or "").lower()]
 
     if not filtered:
         await message.answer(get_text("contracts.search.none", lang_code, query=query))
@@ -1,36 +1,52 @@
 ﻿
 from __future__ import annotations
 
-import io
+import asyncio
 import json
 import logging
 import os
 import re
+import time
+from bisect import bisect_right
+from itertools import accumulate
 from urllib.parse import quote_plus
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from decimal import Decimal, InvalidOperation
-from secrets import choice as secrets_choice
-from typing import Any, Iterable, Optional
+from functools import lru_cache
+from secrets import SystemRandom
+from typing import Any, Awaitable, Callable, Iterable, Optional
 
 from aiogram import F, Router
+from aiogram.exceptions import TelegramAPIError, TelegramRetryAfter
 from aiogram.fsm.context import FSMContext
 from aiogram.types import (
     BufferedInputFile,
     CallbackQuery,
     InlineKeyboardButton,
     InlineKeyboardMarkup,
+    InputMediaAudio,
+    InputMediaDocument,
+    InputMediaPhoto,
     Message,
 )
+from psycopg_pool import AsyncConnectionPool
 
 from app.bot.states.comitee import CourtCaseEditFlow, CourtCaseMediateFlow, CourtClaimFlow
+from app.infrastructure.database.connection.psycopg_connection import PsycopgConnection
 from app.infrastructure.database.db import DB
-from app.infrastructure.database.models.user import UserModel
 from app.services.i18n.localization import get_text
 from app.services.work_items.service import create_work_item
 
-from .comitee_common import is_cancel_command, safe_state_clear, user_language
+from .comitee_common import (
+    is_cancel_command,
+    loads_json,
+    resolve_bot_username,
+    restart_state,
+    safe_state_clear,
+    scholars_group_id,
+)
 from .comitee_menu import INLINE_MENU_BY_KEY, build_inline_keyboard
-from config.config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -47,37 +63,86 @@ CATEGORY_KEYS = {
 }
 
 EVIDENCE_LIMIT = 15
-_CLOSED_STATUSES = {"closed", "cancelled"}
-PROHIBITED_WORDS = {
-    "дурак",
-    "идиот",
-    "тварь",
-    "сука",
-    "мразь",
-    "урод",
-    "убью",
-    "угрожаю",
+_MEDIA_GROUP_LIMIT = 10
+_CAPTION_LIMIT = 1024
+# Mediate recipients stored in FSM data are re-read from the case after this long,
+# so a defendant who joins mid-chat starts receiving messages within a minute.
+_MEDIATE_RECIPIENTS_TTL_SEC = 60
+_MEDIATE_LOG_FLUSH_DELAY_SEC = 0.5
+_MEDIATE_LOG_BATCH_SIZE = 25
+_FAN_OUT_CONCURRENCY = 20
+_MEDIA_ATTRS = ("photo", "document", "audio", "voice", "video", "video_note", "animation", "sticker")
+_MEDIA_GROUP_TYPES = {
+    "photo": InputMediaPhoto,
+    "audio": InputMediaAudio,
+    "document": InputMediaDocument,
+}
+# Evidence kind -> (Bot method, media keyword); anything else goes out as a document.
+_EVIDENCE_SENDERS = {
+    "photo": ("send_photo", "photo"),
+    "contract_photo": ("send_photo", "photo"),
+    "audio": ("send_audio", "audio"),
+    "voice": ("send_voice", "voice"),
 }
-INTEREST_WORDS = {"процент", "проценты", "ростовщ", "риба", "переплата"}
-UNCLEAR_WORDS = {"неясн", "непонят", "без договора", "не договорились"}
+_DOCUMENT_SENDER = ("send_document", "document")
+_CLOSED_STATUSES = frozenset({"closed", "cancelled"})
+# Casefolded replies that mean "no amount" at the amount step.
+_AMOUNT_SKIP_WORDS = frozenset({"нет", "не указано", "не знаю"})
+_URL_PREFIXES = ("http://", "https://")
+PROHIBITED_WORDS = frozenset(
+    {
+        "дурак",
+        "идиот",
+        "тварь",
+        "сука",
+        "мразь",
+        "урод",
+        "убью",
+        "угрожаю",
+    }
+)
+INTEREST_WORDS = frozenset({"процент", "проценты", "ростовщ", "риба", "переплата"})
+UNCLEAR_WORDS = frozenset({"неясн", "непонят", "без договора", "не договорились"})
 INVITE_CODE_LENGTH = 6
-
-
-def _scholars_group_id() -> int:
-    try:
-        value = getattr(settings.bot, "SCHOLARS_GROUP_ID", None)
-        if value is None:
-            value = getattr(settings.bot, "scholars_group_id", 0)
-        return int(value or 0)
-    except (AttributeError, TypeError, ValueError):
-        return 0
-
-
+_INVITE_CODE_ALPHABET = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"
+_SYSTEM_RANDOM = SystemRandom()
+# One scan tags every hit with its word class via the named group that matched.
+_WORD_CLASS_RE = re.compile(
+    "|".join(
+        f"(?P<{name}>{'|'.join(map(re.escape, sorted(words, key=len, reverse=True)))})"
+        for name, words in (
+            ("prohibited", PROHIBITED_WORDS),
+            ("interest", INTEREST_WORDS),
+            ("unclear", UNCLEAR_WORDS),
+        )
+    )
+)
+_PROHIBITED_RE = re.compile("|".join(map(re.escape, sorted(PROHIBITED_WORDS))))
+_CASE_ACTION_RE = re.compile(r"courts:case:(\d+):([a-z_]+)")
+_PERSONAL_DATA_RE = re.compile(r"паспорт|адрес|улиц|дом |квартир|серия")
+# Parsed participant ids are memoized on the case dict under this key.
+_PARTICIPANT_IDS_KEY = "_participant_ids"
+# Per-(font, size) glyph widths shared by every chat PDF wrap.
+_GLYPH_WIDTHS: dict[tuple[str, int], dict[str, float]] = {}
+# Strong references to fire-and-forget tasks so they are not collected mid-flight.
+_BACKGROUND_TASKS: set[asyncio.Task[None]] = set()
+# Pending mediate_log entries per case; a single delayed task per case writes them in one UPDATE.
+_mediate_log_buffers: dict[int, list[dict[str, Any]]] = {}
+_mediate_log_flushers: dict[int, asyncio.Task[None]] = {}
+_mediate_log_locks: dict[int, asyncio.Lock] = {}
+_last_ts_epoch = 0
+_last_ts_str = ""
+
+
+@lru_cache(maxsize=128)
 def _category_label(lang_code: str, slug: str) -> str:
     key = CATEGORY_KEYS.get(slug, "courts.category.unknown")
     return get_text(key, lang_code)
 
 
+# Keyboards depend only on their arguments and translations, which are loaded once at
+# startup, so instances are cached and shared; aiogram never mutates reply markups.
+@lru_cache(maxsize=32)
 def _build_category_keyboard(lang_code: str) -> InlineKeyboardMarkup:
     buttons = [
         ["financial", "contract_breach"],
@@ -107,6 +172,7 @@ def _build_category_keyboard(lang_code: str) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
 
+@lru_cache(maxsize=32)
 def _build_contract_keyboard(lang_code: str) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(
         inline_keyboard=[
@@ -126,6 +192,7 @@ def _build_contract_keyboard(lang_code: str) -> InlineKeyboardMarkup:
     )
 
 
+@lru_cache(maxsize=32)
 def _build_family_keyboard(lang_code: str) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(
         inline_keyboard=[
@@ -151,6 +218,7 @@ def _build_family_keyboard(lang_code: str) -> InlineKeyboardMarkup:
     )
 
 
+@lru_cache(maxsize=32)
 def _build_evidence_keyboard(lang_code: str, *, include_skip: bool = True) -> InlineKeyboardMarkup:
     keyboard = [
         [
@@ -190,33 +258,71 @@ def _build_evidence_keyboard(lang_code: str, *, include_skip: bool = True) -> In
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
 
+@lru_cache(maxsize=32)
+def _build_confirm_keyboard(lang_code: str) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(
+        inline_keyboard=[
+            [
+                InlineKeyboardButton(
+                    text=get_text(f"button.courts.confirm.{action}", lang_code),
+                    callback_data=f"courts:confirm:{action}",
+                )
+            ]
+            for action in ("send", "edit", "cancel")
+        ]
+    )
+
+
 def _contains_personal_data(text: str) -> bool:
-    lowered = text.lower()
-    if any(word in lowered for word in ("паспорт", "адрес", "улиц", "дом ", "квартир", "серия")):
+    if _PERSONAL_DATA_RE.search(text.lower()):
         return True
-    digits = re.sub(r"\D", "", text)
-    return len(digits) >= 6
+    digits = 0
+    for ch in text:
+        if ch.isdecimal():
+            digits += 1
+            if digits >= 6:
+                return True
+    return False
 
 
 def _contains_prohibited_content(text: str) -> bool:
-    lowered = text.lower()
-    return any(word in lowered for word in PROHIBITED_WORDS)
+    return _PROHIBITED_RE.search(text.lower()) is not None
 
 
 def _generate_invite_code() -> str:
-    alphabet = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"
-    return "".join(secrets_choice(alphabet) for _ in range(INVITE_CODE_LENGTH))
+    return "".join(_SYSTEM_RANDOM.choices(_INVITE_CODE_ALPHABET, k=INVITE_CODE_LENGTH))
 
 
-async def _resolve_bot_username(bot: Any) -> str | None:
-    username = getattr(bot, "username", None)
-    if username:
-        return username
-    try:
-        me = await bot.get_me()
-        return getattr(me, "username", None)
-    except Exception:
-        return None
+def _participant_ids(case: dict[str, Any]) -> list[int]:
+    cached = case.get(_PARTICIPANT_IDS_KEY)
+    if cached is not None:
+        return cached
+    participants = case.get("participants") or []
+    if isinstance(participants, str):
+        try:
+            participants = loads_json(participants)
+        except json.JSONDecodeError:
+            participants = []
+    result = [
+        int(item)
+        for item in participants or []
+        if isinstance(item, (int, float)) or (isinstance(item, str) and item.strip().isdigit())
+    ]
+    case[_PARTICIPANT_IDS_KEY] = result
+    return result
+
+
+def _case_evidence(case: dict[str, Any]) -> list[dict[str, Any]]:
+    # JSONB arrives as a list from psycopg; a text payload is parsed once and the
+    # result stored back on the case dict.
+    evidence = case.get("evidence") or []
+    if isinstance(evidence, str):
+        try:
+            evidence = loads_json(evidence)
+        except json.JSONDecodeError:
+            evidence = []
+        case["evidence"] = evidence
+    return evidence
 
 
 def _case_role(case: dict[str, Any], user_id: int) -> str:
@@ -224,30 +330,13 @@ def _case_role(case: dict[str, Any], user_id: int) -> str:
         return "plaintiff"
     if case.get("defendant_id") == user_id:
         return "defendant"
-    participants = case.get("participants") or []
-    if isinstance(participants, str):
-        try:
-            participants = json.loads(participants)
-        except json.JSONDecodeError:
-            participants = []
-    if user_id in participants:
+    if user_id in _participant_ids(case):
         return "participant"
     return "unknown"
 
 
 def _case_participants(case: dict[str, Any]) -> set[int]:
-    participants = case.get("participants") or []
-    if isinstance(participants, str):
-        try:
-            participants = json.loads(participants)
-        except json.JSONDecodeError:
-            participants = []
-    result: set[int] = set()
-    for item in participants or []:
-        try:
-            result.add(int(item))
-        except (TypeError, ValueError):
-            continue
+    result = set(_participant_ids(case))
     for key in ("plaintiff_id", "defendant_id", "user_id"):
         value = case.get(key)
         if value:
@@ -271,6 +360,25 @@ def _resolve_scholar_observer(case: dict[str, Any]) -> Optional[int]:
     return None
 
 
+def _mediate_recipients(case: dict[str, Any], sender_id: int) -> list[int]:
+    recipients = _case_participants(case)
+    scholar_id = _resolve_scholar_observer(case)
+    if scholar_id:
+        recipients.add(scholar_id)
+    recipients.discard(int(sender_id))
+    return sorted(recipients)
+
+
+def _mediate_state(case: dict[str, Any], sender_id: int) -> dict[str, Any]:
+    # FSM fields that let handle_mediate_message skip the case lookup per message.
+    return {
+        "mediate_case_id": int(case.get("id") or 0),
+        "mediate_recipients": _mediate_recipients(case, sender_id),
+        "mediate_recipients_at": time.time(),
+    }
+
+
+@lru_cache(maxsize=1)
 def _pdf_font_path() -> Optional[str]:
     candidates = [
         os.getenv("CHAT_PDF_FONT_PATH"),
@@ -285,69 +393,96 @@ def _pdf_font_path() -> Optional[str]:
     return None
 
 
+@lru_cache(maxsize=1)
+def _chat_pdf_font_name() -> str:
+    font_path = _pdf_font_path()
+    if font_path:
+        try:
+            from reportlab.pdfbase import pdfmetrics
+            from reportlab.pdfbase.ttfonts import TTFont
+
+            pdfmetrics.registerFont(TTFont("ChatFont", font_path))
+            return "ChatFont"
+        except Exception:
+            logger.exception("Failed to register PDF font")
+    return "Helvetica"
+
+
 def _wrap_pdf_text(text: str, *, font_name: str, font_size: int, max_width: float) -> list[str]:
     from reportlab.pdfbase import pdfmetrics
 
     if not text:
         return [""]
+    # stringWidth is additive per glyph, so each character is measured once per
+    # (font, size) for the process lifetime and line widths are summed from the table.
+    char_widths = _GLYPH_WIDTHS.setdefault((font_name, font_size), {})
+
+    def text_width(value: str) -> float:
+        total = 0.0
+        for ch in value:
+            width = char_widths.get(ch)
+            if width is None:
+                width = char_widths[ch] = pdfmetrics.stringWidth(ch, font_name, font_size)
+            total += width
+        return total
+
+    space_width = text_width(" ")
     lines: list[str] = []
     for paragraph in text.splitlines():
         words = paragraph.split()
         if not words:
             lines.append("")
             continue
-        current = ""
+        current: list[str] = []
+        current_width = 0.0
         for word in words:
-            candidate = f"{current} {word}".strip()
-            if pdfmetrics.stringWidth(candidate, font_name, font_size) <= max_width:
-                current = candidate
+            word_width = text_width(word)
+            candidate_width = current_width + space_width + word_width if current else word_width
+            if candidate_width <= max_width:
+                current.append(word)
+                current_width = candidate_width
                 continue
             if current:
-                lines.append(current)
-            if pdfmetrics.stringWidth(word, font_name, font_size) <= max_width:
-                current = word
+                lines.append(" ".join(current))
+            if word_width <= max_width:
+                current = [word]
+                current_width = word_width
                 continue
-            chunk = ""
-            for ch in word:
-                candidate = f"{chunk}{ch}"
-                if pdfmetrics.stringWidth(candidate, font_name, font_size) <= max_width:
-                    chunk = candidate
-                else:
-                    if chunk:
-                        lines.append(chunk)
-                    chunk = ch
-            current = chunk
+            # Split an over-long word by bisecting its cumulative glyph widths.
+            cumulative = list(accumulate(char_widths[ch] for ch in word))
+            start = 0
+            offset = 0.0
+            while True:
+                end = max(bisect_right(cumulative, offset + max_width, lo=start), start + 1)
+                if end >= len(word):
+                    break
+                lines.append(word[start:end])
+                offset = cumulative[end - 1]
+                start = end
+            current = [word[start:]]
+            current_width = cumulative[-1] - offset
         if current:
-            lines.append(current)
+            lines.append(" ".join(current))
     return lines
 
 
 def _render_chat_pdf(lines: list[str]) -> Optional[bytes]:
     try:
         from reportlab.lib.pagesizes import A4
-        from reportlab.pdfbase import pdfmetrics
-        from reportlab.pdfbase.ttfonts import TTFont
         from reportlab.pdfgen import canvas
     except Exception:
         logger.exception("reportlab is not available for chat PDF")
         return None
 
-    buffer = io.BytesIO()
     page_width, page_height = A4
     margin = 48
-    font_path = _pdf_font_path()
-    font_name = "Helvetica"
-    if font_path:
-        try:
-            pdfmetrics.registerFont(TTFont("ChatFont", font_path))
-            font_name = "ChatFont"
-        except Exception:
-            logger.exception("Failed to register PDF font")
+    font_name = _chat_pdf_font_name()
 
     title_size = 14
     body_size = 10
     line_height = body_size + 4
-    canvas_obj = canvas.Canvas(buffer, pagesize=A4)
+    # getpdfdata() returns the document bytes directly, so no BytesIO sink is needed.
+    canvas_obj = canvas.Canvas(None, pagesize=A4)
     y = page_height - margin
     max_width = page_width - margin * 2
 
@@ -363,27 +498,23 @@ def _render_chat_pdf(lines: list[str]) -> Optional[bytes]:
             y -= line_height
         y -= 4
 
-    canvas_obj.save()
-    return buffer.getvalue()
+    return canvas_obj.getpdfdata()
 
 
 def _normalize_mediate_log(raw: Any) -> list[dict[str, Any]]:
-    if raw is None:
-        return []
-    if isinstance(raw, list):
-        return [item for item in raw if isinstance(item, dict)]
-    if isinstance(raw, dict):
-        return [raw]
     if isinstance(raw, str):
         try:
-            parsed = json.loads(raw)
+            raw = loads_json(raw)
         except Exception:
             return []
-        if isinstance(parsed, list):
-            return [item for item in parsed if isinstance(item, dict)]
-        if isinstance(parsed, dict):
-            return [parsed]
-    return []
+    if isinstance(raw, dict):
+        return [raw]
+    if not isinstance(raw, list):
+        return []
+    # JSONB logs are written as lists of dicts, so the common case needs no copy.
+    if all(isinstance(item, dict) for item in raw):
+        return raw
+    return [item for item in raw if isinstance(item, dict)]
 
 
 def _build_mediate_pdf_lines(
@@ -423,6 +554,22 @@ def _build_mediate_pdf_lines(
     return lines
 
 
+def _mediate_history_lines(log: list[dict[str, Any]], lang_code: str) -> Iterable[str]:
+    yield get_text("courts.case.mediate.history.title", lang_code)
+    media_label: str | None = None
+    for entry in log:
+        ts = entry.get("ts") or ""
+        name = entry.get("name") or "-"
+        text = entry.get("text") or ""
+        if (entry.get("kind") or "text") == "media":
+            if media_label is None:
+                media_label = get_text("courts.case.mediate.history.media", lang_code)
+            line = f"[{ts}] {name}: {media_label}"
+            yield f"{line} ({text})" if text else line
+        else:
+            yield f"[{ts}] {name}: {text}"
+
+
 async def _send_mediate_history(
     *,
     bot: Any,
@@ -432,33 +579,21 @@ async def _send_mediate_history(
 ) -> None:
     if not log:
         return
-    title = get_text("courts.case.mediate.history.title", lang_code)
-    lines: list[str] = [title]
-    for entry in log:
-        ts = entry.get("ts") or ""
-        name = entry.get("name") or "-"
-        kind = entry.get("kind") or "text"
-        text = entry.get("text") or ""
-        if kind == "media":
-            label = get_text("courts.case.mediate.history.media", lang_code)
-            line = f"[{ts}] {name}: {label}"
-            if text:
-                line = f"{line} ({text})"
-        else:
-            line = f"[{ts}] {name}: {text}"
-        lines.append(line)
-
     max_len = 3500
-    current = ""
-    for line in lines:
-        candidate = f"{current}\n{line}" if current else line
-        if len(candidate) > max_len:
-            await bot.send_message(chat_id=chat_id, text=current)
-            current = line
+    # Lines stream straight into the chunk buffer; only flushed chunks are joined.
+    buffer: list[str] = []
+    buffer_len = 0
+    for line in _mediate_history_lines(log, lang_code):
+        needed = buffer_len + 1 + len(line) if buffer else len(line)
+        if buffer and needed > max_len:
+            await bot.send_message(chat_id=chat_id, text="\n".join(buffer))
+            buffer = [line]
+            buffer_len = len(line)
         else:
-            current = candidate
-    if current:
-        await bot.send_message(chat_id=chat_id, text=current)
+            buffer.append(line)
+            buffer_len = needed
+    if buffer:
+        await bot.send_message(chat_id=chat_id, text="\n".join(buffer))
 
 
 async def _finalize_mediate_chat(
@@ -469,6 +604,7 @@ async def _finalize_mediate_chat(
     lang_code: str,
     notify_chat_id: int,
 ) -> None:
+    await _flush_mediate_log(db, case_id)
     log = _normalize_mediate_log(await db.court_cases.get_mediate_log(case_id=case_id))
     if not log:
         await bot.send_message(chat_id=notify_chat_id, text=get_text("courts.case.mediate.pdf.empty", lang_code))
@@ -512,6 +648,7 @@ async def _finalize_mediate_chat(
     await db.court_cases.append_evidence(case_id=case_id, evidence_item=evidence_item)
 
 
+@lru_cache(maxsize=256)
 def _build_mediate_keyboard(lang_code: str, *, case_id: int, mode: str) -> InlineKeyboardMarkup:
     if mode == "join":
         button = InlineKeyboardButton(
@@ -526,6 +663,44 @@ def _build_mediate_keyboard(lang_code: str, *, case_id: int, mode: str) -> Inlin
     return InlineKeyboardMarkup(inline_keyboard=[[button]])
 
 
+async def _retry_after(call: Callable[[], Awaitable[Any]]) -> Any:
+    # Honour one flood-control pause instead of dropping the message; a second one propagates.
+    try:
+        return await call()
+    except TelegramRetryAfter as exc:
+        await asyncio.sleep(exc.retry_after)
+        return await call()
+
+
+async def _fan_out(
+    recipients: Iterable[int],
+    send: Callable[[int], Awaitable[Any]],
+    *,
+    error_message: str,
+) -> None:
+    semaphore = asyncio.Semaphore(_FAN_OUT_CONCURRENCY)
+    # Telegram API errors (blocked bot, flood control, bad chat) are expected during a fan-out:
+    # they are collected into one warning without tracebacks. Anything else is logged in full.
+    api_errors: dict[int, str] = {}
+
+    async def deliver(recipient_id: int) -> None:
+        async with semaphore:
+            try:
+                await send(recipient_id)
+            except TelegramAPIError as exc:
+                api_errors[recipient_id] = exc.message
+            except Exception:
+                logger.exception(error_message, recipient_id)
+
+    await asyncio.gather(*(deliver(int(recipient_id)) for recipient_id in recipients))
+    if api_errors:
+        logger.warning(
+            error_message + ": %s",
+            ", ".join(map(str, api_errors)),
+            "; ".join(sorted(set(api_errors.values()))),
+        )
+
+
 async def _notify_mediate_start(
     *,
     bot: Any,
@@ -533,11 +708,7 @@ async def _notify_mediate_start(
     initiator: Any,
     lang_code: str,
 ) -> None:
-    recipients = _case_participants(case)
-    scholar_id = _resolve_scholar_observer(case)
-    if scholar_id:
-        recipients.add(scholar_id)
-    recipients.discard(int(getattr(initiator, "id", 0) or 0))
+    recipients = _mediate_recipients(case, int(getattr(initiator, "id", 0) or 0))
     if not recipients:
         return
     case_number = case.get("case_number") or case.get("id") or "-"
@@ -549,11 +720,13 @@ async def _notify_mediate_start(
         name=name,
     )
     keyboard = _build_mediate_keyboard(lang_code, case_id=int(case.get("id") or 0), mode="join")
-    for recipient_id in recipients:
-        try:
-            await bot.send_message(chat_id=int(recipient_id), text=text, reply_markup=keyboard)
-        except Exception:
-            logger.exception("Failed to notify mediate chat for %s", recipient_id)
+    await _fan_out(
+        recipients,
+        lambda recipient_id: _retry_after(
+            lambda: bot.send_message(chat_id=recipient_id, text=text, reply_markup=keyboard)
+        ),
+        error_message="Failed to notify mediate chat for %s",
+    )
 
 
 def _opponent_name(case: dict[str, Any], user_id: int) -> str:
@@ -564,8 +737,8 @@ def _opponent_name(case: dict[str, Any], user_id: int) -> str:
 
 
 def _parse_amount(text: str) -> Decimal | None:
-    cleaned = text.strip().lower()
-    if cleaned in {"нет", "не указано", "не знаю"}:
+    cleaned = text.strip().casefold()
+    if cleaned in _AMOUNT_SKIP_WORDS:
         return None
     cleaned = cleaned.replace(" ", "").replace(",", ".")
     try:
@@ -577,6 +750,25 @@ def _parse_amount(text: str) -> Decimal | None:
     return value
 
 
+def _normalize_amount(raw: Any) -> Decimal | None:
+    # FSM storage may hand the amount back as a Decimal or as its string form.
+    if isinstance(raw, Decimal):
+        return raw
+    if isinstance(raw, str):
+        return _parse_amount(raw)
+    return None
+
+
+def _utc_timestamp() -> str:
+    # Second-resolution ISO timestamp; bursts within one second reuse the same string.
+    global _last_ts_epoch, _last_ts_str
+    now = int(time.time())
+    if now != _last_ts_epoch:
+        _last_ts_str = datetime.fromtimestamp(now, timezone.utc).isoformat()
+        _last_ts_epoch = now
+    return _last_ts_str
+
+
 def _evidence_item(
     *,
     kind: str,
@@ -601,10 +793,14 @@ def _evidence_item(
         "text": text,
         "url": url,
         "caption": caption,
-        "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "created_at": _utc_timestamp(),
     }
 
 
+def _mediate_log_entry(*, kind: str, name: str, text: str) -> dict[str, Any]:
+    return {"ts": _utc_timestamp(), "name": name, "text": text, "kind": kind}
+
+
 def _build_confirmation(data: dict[str, Any], lang_code: str) -> str:
     amount = data.get("amount")
     evidence = data.get("evidence") or []
@@ -621,15 +817,17 @@ def _build_confirmation(data: dict[str, Any], lang_code: str) -> str:
     )
 
 
+def _word_classes(lowered: str) -> set[str]:
+    return {match.lastgroup for match in _WORD_CLASS_RE.finditer(lowered)}
+
+
 def _sharia_check(claim_text: str, category: str) -> tuple[str, str | None]:
-    lowered = claim_text.lower()
-    if any(word in lowered for word in INTEREST_WORDS):
-        return "block", "courts.sharia.blocked"
-    if _contains_prohibited_content(claim_text):
+    word_classes = _word_classes(claim_text.lower())
+    if "interest" in word_classes or "prohibited" in word_classes:
         return "block", "courts.sharia.blocked"
     if len(claim_text.strip()) < 20:
         return "clarify", "courts.sharia.clarify"
-    if any(word in lowered for word in UNCLEAR_WORDS):
+    if "unclear" in word_classes:
         return "clarify", "courts.sharia.clarify"
     if category == "family":
         return "ok", None
@@ -679,7 +877,7 @@ async def _show_cases(
 def _build_case_details(item: dict[str, Any], lang_code: str) -> str:
     case_number = item.get("case_number") or str(item.get("id") or "")
     category = _category_label(lang_code, str(item.get("category") or ""))
-    evidence = item.get("evidence") or []
+    evidence = _case_evidence(item)
     claim = item.get("claim") or "-"
     status_key = f"courts.status.{item.get('status') or 'open'}"
     status_label = get_text(status_key, lang_code)
@@ -698,56 +896,93 @@ def _build_case_details(item: dict[str, Any], lang_code: str) -> str:
     )
 
 
-async def _forward_case_to_scholars(
-    *,
+def _evidence_media_group(kind: str | None) -> str | None:
+    # Telegram only groups photos, audio or documents with their own kind; voice notes
+    # cannot be part of a media group at all.
+    if kind in {"photo", "contract_photo"}:
+        return "photo"
+    if kind == "audio":
+        return "audio"
+    if kind == "voice":
+        return None
+    return "document"
+
+
+async def _send_evidence_file(
     bot: Any,
-    lang_code: str,
-    case: dict[str, Any],
-    user: Any,
-) -> bool:
-    group_id = _scholars_group_id()
-    if not group_id:
-        return False
+    *,
+    chat_id: int,
+    kind: str | None,
+    file_id: str,
+    caption: str | None,
+) -> None:
+    method, media_key = _EVIDENCE_SENDERS.get(kind, _DOCUMENT_SENDER)
+    await getattr(bot, method)(chat_id=chat_id, caption=caption, **{media_key: file_id})
 
 
-async def _send_case_evidence(
+async def _send_evidence_items(
     *,
     bot: Any,
-    message: Message,
+    chat_id: int,
     lang_code: str,
     evidence: list[dict[str, Any]],
 ) -> None:
-    if not evidence:
-        await message.answer(get_text("courts.evidence.empty", lang_code))
-        return
-    await message.answer(get_text("courts.evidence.list.title", lang_code))
+    pending: list[tuple[str | None, str, str | None]] = []
+    pending_group: str | None = None
+
+    async def flush() -> None:
+        nonlocal pending, pending_group
+        if len(pending) == 1:
+            kind, file_id, caption = pending[0]
+            await _send_evidence_file(bot, chat_id=chat_id, kind=kind, file_id=file_id, caption=caption)
+        elif pending:
+            media_cls = _MEDIA_GROUP_TYPES[pending_group]
+            await bot.send_media_group(
+                chat_id=chat_id,
+                media=[media_cls(media=file_id, caption=caption) for _, file_id, caption in pending],
+            )
+        pending = []
+        pending_group = None
+
     for item in evidence:
-        kind = (item or {}).get("type")
+        if not isinstance(item, dict):
+            continue
+        kind = item.get("type")
         if kind in {"text", "link"}:
-            text = (item or {}).get("text") or (item or {}).get("url")
+            await flush()
+            text = item.get("text") or item.get("url")
             if text:
-                await message.answer(
-                    get_text("courts.case.forward.evidence.text", lang_code, text=text),
+                await bot.send_message(
+                    chat_id=chat_id,
+                    text=get_text("courts.case.forward.evidence.text", lang_code, text=text),
                 )
             continue
-        file_id = (item or {}).get("file_id")
-        caption = (item or {}).get("caption")
+        file_id = item.get("file_id")
         if not file_id:
             continue
-        if kind in {"photo", "contract_photo"}:
-            await bot.send_photo(chat_id=message.chat.id, photo=file_id, caption=caption)
-        elif kind in {"audio"}:
-            await bot.send_audio(chat_id=message.chat.id, audio=file_id, caption=caption)
-        elif kind in {"voice"}:
-            await bot.send_voice(chat_id=message.chat.id, voice=file_id, caption=caption)
-        else:
-            await bot.send_document(chat_id=message.chat.id, document=file_id, caption=caption)
-    evidence = case.get("evidence") or []
-    if isinstance(evidence, str):
-        try:
-            evidence = json.loads(evidence)
-        except json.JSONDecodeError:
-            evidence = []
+        caption = item.get("caption")
+        group = _evidence_media_group(kind)
+        if group != pending_group or len(pending) >= _MEDIA_GROUP_LIMIT:
+            await flush()
+        if group is None:
+            await _send_evidence_file(bot, chat_id=chat_id, kind=kind, file_id=file_id, caption=caption)
+            continue
+        pending.append((kind, file_id, caption))
+        pending_group = group
+    await flush()
+
+
+async def _forward_case_to_scholars(
+    *,
+    bot: Any,
+    lang_code: str,
+    case: dict[str, Any],
+    user: Any,
+) -> bool:
+    group_id = scholars_group_id()
+    if not group_id:
+        return False
+    evidence = _case_evidence(case)
     username = f"@{user.username}" if getattr(user, "username", None) else "-"
     summary = get_text(
         "courts.case.forward.summary",
@@ -763,45 +998,192 @@ async def _send_case_evidence(
         username=username,
         user_id=getattr(user, "id", "-"),
     )
+    # Everything goes to the single scholars group and must arrive in order, so the
+    # sends stay sequential; callers run this off the reply path instead.
     try:
         await bot.send_message(chat_id=group_id, text=summary)
-        for item in evidence:
-            kind = (item or {}).get("type")
-            if kind in {"text", "link"}:
-                text = (item or {}).get("text") or (item or {}).get("url")
-                if text:
-                    await bot.send_message(
-                        chat_id=group_id,
-                        text=get_text("courts.case.forward.evidence.text", lang_code, text=text),
-                    )
-                continue
-            file_id = (item or {}).get("file_id")
-            caption = (item or {}).get("caption")
-            if not file_id:
-                continue
-            if kind in {"photo", "contract_photo"}:
-                await bot.send_photo(chat_id=group_id, photo=file_id, caption=caption)
-            elif kind in {"audio"}:
-                await bot.send_audio(chat_id=group_id, audio=file_id, caption=caption)
-            elif kind in {"voice"}:
-                await bot.send_voice(chat_id=group_id, voice=file_id, caption=caption)
-            else:
-                await bot.send_document(chat_id=group_id, document=file_id, caption=caption)
+        await _send_evidence_items(bot=bot, chat_id=group_id, lang_code=lang_code, evidence=evidence)
         return True
     except Exception:
         logger.exception("Failed to forward case to scholars group")
         return False
 
+
+async def _send_case_evidence(
+    *,
+    bot: Any,
+    message: Message,
+    lang_code: str,
+    evidence: list[dict[str, Any]],
+) -> None:
+    if not evidence:
+        await message.answer(get_text("courts.evidence.empty", lang_code))
+        return
+    await message.answer(get_text("courts.evidence.list.title", lang_code))
+    await _send_evidence_items(bot=bot, chat_id=message.chat.id, lang_code=lang_code, evidence=evidence)
+
+
+def _spawn_background(coro: Awaitable[None]) -> None:
+    task = asyncio.create_task(coro)
+    _BACKGROUND_TASKS.add(task)
+    task.add_done_callback(_BACKGROUND_TASKS.discard)
+
+
+def _queue_mediate_log(db_pool: AsyncConnectionPool, case_id: int, entry: dict[str, Any]) -> None:
+    buffer = _mediate_log_buffers.setdefault(case_id, [])
+    buffer.append(entry)
+    if len(buffer) >= _MEDIATE_LOG_BATCH_SIZE:
+        pending = _mediate_log_flushers.pop(case_id, None)
+        if pending is not None:
+            pending.cancel()
+        delay = 0.0
+    elif case_id in _mediate_log_flushers:
+        return
+    else:
+        delay = _MEDIATE_LOG_FLUSH_DELAY_SEC
+    _mediate_log_flushers[case_id] = asyncio.create_task(
+        _flush_mediate_log_later(db_pool, case_id, delay)
+    )
+
+
+async def _flush_mediate_log_later(db_pool: AsyncConnectionPool, case_id: int, delay: float) -> None:
+    await asyncio.sleep(delay)
+    # Entries are only taken under the lock, so a flusher cancelled before this point loses nothing.
+    async with _mediate_log_locks.setdefault(case_id, asyncio.Lock()):
+        if _mediate_log_flushers.get(case_id) is asyncio.current_task():
+            del _mediate_log_flushers[case_id]
+        entries = _mediate_log_buffers.pop(case_id, None)
+        if not entries:
+            return
+        try:
+            async with db_pool.connection() as raw_connection:
+                db = DB(PsycopgConnection(raw_connection))
+                await db.court_cases.append_mediate_log_entries(case_id=case_id, entries=entries)
+        except Exception:
+            logger.exception("Failed to flush %s mediate log entries for case %s", len(entries), case_id)
+    _drop_idle_mediate_log_lock(case_id)
+
+
+async def _flush_mediate_log(db: DB, case_id: int) -> None:
+    pending = _mediate_log_flushers.pop(case_id, None)
+    if pending is not None:
+        pending.cancel()
+    # Waiting on the lock lets an in-flight batch land first, keeping the log in order.
+    try:
+        async with _mediate_log_locks.setdefault(case_id, asyncio.Lock()):
+            entries = _mediate_log_buffers.pop(case_id, None)
+            if entries:
+                await db.court_cases.append_mediate_log_entries(case_id=case_id, entries=entries)
+    finally:
+        _drop_idle_mediate_log_lock(case_id)
+
+
+async def flush_all_mediate_logs(db_pool: AsyncConnectionPool) -> None:
+    """Write every buffered mediate log entry; called on shutdown before the pool closes."""
+    for case_id in set(_mediate_log_buffers) | set(_mediate_log_flushers):
+        async with _mediate_log_locks.setdefault(case_id, asyncio.Lock()):
+            # Holding the lock means the flusher is not mid-write, so cancelling it is safe.
+            pending = _mediate_log_flushers.pop(case_id, None)
+            if pending is not None:
+                pending.cancel()
+            entries = _mediate_log_buffers.pop(case_id, None)
+            if not entries:
+                continue
+            try:
+                async with db_pool.connection() as raw_connection:
+                    db = DB(PsycopgConnection(raw_connection))
+                    await db.court_cases.append_mediate_log_entries(case_id=case_id, entries=entries)
+            except Exception:
+                logger.exception("Failed to flush %s mediate log entries for case %s", len(entries), case_id)
+    _mediate_log_locks.clear()
+
+
+def _drop_idle_mediate_log_lock(case_id: int) -> None:
+    # Only called outside the lock, so nobody can be holding it while it is replaced.
+    lock = _mediate_log_locks.get(case_id)
+    if (
+        lock is not None
+        and not lock.locked()
+        and case_id not in _mediate_log_buffers
+        and case_id not in _mediate_log_flushers
+    ):
+        del _mediate_log_locks[case_id]
+
+
+async def _dispatch_case_to_scholars(
+    *,
+    bot: Any,
+    db_pool: AsyncConnectionPool,
+    lang_code: str,
+    case: dict[str, Any],
+    user: Any,
+    notify_chat_id: int | None = None,
+) -> None:
+    # Runs after the handler has returned, so it takes its own pool connection
+    # instead of the request-scoped one. The caller has already claimed the send
+    # with claim_scholar_send; a failed forward releases that claim.
+    case_id = int(case.get("id") or 0)
+    try:
+        sent = await _forward_case_to_scholars(bot=bot, lang_code=lang_code, case=case, user=user)
+    except Exception:
+        logger.exception("Failed to dispatch court case %s to scholars", case_id)
+        sent = False
+    try:
+        if not sent:
+            async with db_pool.connection() as raw_connection:
+                db = DB(PsycopgConnection(raw_connection))
+                await db.court_cases.mark_sent_to_scholar(case_id=case_id, sent=False)
+        if notify_chat_id is not None:
+            await bot.send_message(
+                chat_id=notify_chat_id,
+                text=get_text(
+                    "courts.case.sent_to_scholar" if sent else "courts.file.unavailable",
+                    lang_code,
+                ),
+            )
+    except Exception:
+        logger.exception("Failed to finish scholar dispatch for court case %s", case_id)
+
+
+# Case details rows as (label key suffix, callback action, shown for
+# (is_plaintiff, is_closed)), in display order.
+_CASE_DETAILS_ROWS: tuple[tuple[str, str, Callable[[bool, bool], bool]], ...] = (
+    ("add_evidence", "add_evidence", lambda plaintiff, closed: not closed),
+    ("view_evidence", "view_evidence", lambda plaintiff, closed: True),
+    ("edit_claim", "edit_claim", lambda plaintiff, closed: plaintiff and not closed),
+    ("edit_category", "edit_category", lambda plaintiff, closed: plaintiff and not closed),
+    ("cancel_case", "cancel", lambda plaintiff, closed: plaintiff and not closed),
+    ("send_scholar", "send_scholar", lambda plaintiff, closed: plaintiff and not closed),
+    ("invite", "invite", lambda plaintiff, closed: plaintiff and not closed),
+    ("mediate", "mediate", lambda plaintiff, closed: True),
+)
+
+
+@lru_cache(maxsize=64)
+def _case_details_buttons(
+    lang_code: str,
+    is_plaintiff: bool,
+    is_closed: bool,
+) -> tuple[tuple[str, str | None], ...]:
+    # (label, action) pairs for the case details keyboard; only the case id varies
+    # per render, and a None action is the back button.
+    buttons: list[tuple[str, str | None]] = [
+        (get_text(f"button.courts.details.{label}", lang_code), action)
+        for label, action, visible in _CASE_DETAILS_ROWS
+        if visible(is_plaintiff, is_closed)
+    ]
+    buttons.append((get_text("button.back", lang_code), None))
+    return tuple(buttons)
+
+
 @router.callback_query(F.data == "courts:file")
 async def handle_courts_file(
     callback: CallbackQuery,
     state: FSMContext,
-    user_row: Optional[UserModel],
+    lang_code: str,
 ) -> None:
-    lang_code = user_language(user_row, callback.from_user)
     await callback.answer()
-    await state.clear()
-    await state.set_state(CourtClaimFlow.choosing_category)
+    await restart_state(state, CourtClaimFlow.choosing_category)
     await callback.message.answer(
         get_text("courts.step.category", lang_code),
         reply_markup=_build_category_keyboard(lang_code),
@@ -812,11 +1194,10 @@ async def handle_courts_file(
 async def handle_courts_category(
     callback: CallbackQuery,
     state: FSMContext,
-    user_row: Optional[UserModel],
+    lang_code: str,
 ) -> None:
-    lang_code = user_language(user_row, callback.from_user)
     await callback.answer()
-    slug = (callback.data or "").split(":", 2)[-1].strip()
+    slug = (callback.data or "").rpartition(":")[2].strip()
     if slug not in CATEGORY_KEYS:
         await callback.answer(get_text("error.request.invalid", lang_code), show_alert=True)
         return
@@ -829,9 +1210,8 @@ async def handle_courts_category(
 async def handle_plaintiff(
     message: Message,
     state: FSMContext,
-    user_row: Optional[UserModel],
+    lang_code: str,
 ) -> None:
-    lang_code = user_language(user_row, message.from_user)
     text = (message.text or "").strip()
     if not text:
         await message.answer(get_text("courts.error.name.empty", lang_code))
@@ -848,9 +1228,8 @@ async def handle_plaintiff(
 async def handle_defendant(
     message: Message,
     state: FSMContext,
-    user_row: Optional[UserModel],
+    lang_code: str,
 ) -> None:
-    lang_code = user_language(user_row, message.from_user)
     text = (message.text or "").strip()
     if not text:
         await message.answer(get_text("courts.error.name.empty", lang_code))
@@ -867,9 +1246,8 @@ async def handle_defendant(
 async def handle_claim(
     message: Message,
     state: FSMContext,
-    user_row: Optional[UserModel],
+    lang_code: str,
 ) -> None:
-    lang_code = user_language(user_row, message.from_user)
     text = (message.text or "").strip()
     if not text:
         await message.answer(get_text("courts.error.claim.empty", lang_code))
@@ -895,7 +1273,7 @@ async def handle_claim(
         )
     else:
         await state.update_data(claim_text=text)
-    data = await state.get_data()
+    # The claim step does not touch the category, so the snapshot read above is current.
     category = str(data.get("category") or "")
     if category == "financial":
         await state.set_state(CourtClaimFlow.waiting_for_amount)
@@ -926,12 +1304,11 @@ async def handle_claim(
 async def handle_amount(
     message: Message,
     state: FSMContext,
-    user_row: Optional[UserModel],
+    lang_code: str,
 ) -> None:
-    lang_code = user_language(user_row, message.from_user)
     text = (message.text or "").strip()
     amount = _parse_amount(text)
-    if text.lower() not in {"нет", "не указано", "не знаю"} and amount is None:
+    if amount is None and text.casefold() not in _AMOUNT_SKIP_WORDS:
         await message.answer(get_text("courts.error.amount.invalid", lang_code))
         return
     await state.update_data(amount=amount)
@@ -946,11 +1323,10 @@ async def handle_amount(
 async def handle_contract_question(
     callback: CallbackQuery,
     state: FSMContext,
-    user_row: Optional[UserModel],
+    lang_code: str,
 ) -> None:
-    lang_code = user_language(user_row, callback.from_user)
     await callback.answer()
-    choice = (callback.data or "").split(":", 2)[-1]
+    choice = (callback.data or "").rpartition(":")[2]
     if choice == "yes":
         await state.update_data(contract_present=True)
         await state.set_state(CourtClaimFlow.waiting_for_contract_file)
@@ -968,9 +1344,8 @@ async def handle_contract_question(
 async def handle_contract_file(
     message: Message,
     state: FSMContext,
-    user_row: Optional[UserModel],
+    lang_code: str,
 ) -> None:
-    lang_code = user_language(user_row, message.from_user)
     document = message.document
     photo = message.photo[-1] if message.photo else None
     if document is None and photo is None:
@@ -1014,11 +1389,10 @@ async def handle_contract_file(
 async def handle_family_relation(
     callback: CallbackQuery,
     state: FSMContext,
-    user_row: Optional[UserModel],
+    lang_code: str,
 ) -> None:
-    lang_code = user_language(user_row, callback.from_user)
     await callback.answer()
-    choice = (callback.data or "").split(":", 2)[-1]
+    choice = (callback.data or "").rpartition(":")[2]
     if choice == "inheritance":
         await state.clear()
         await callback.message.answer(
@@ -1044,39 +1418,17 @@ async def handle_family_relation(
 async def handle_evidence_choice(
     callback: CallbackQuery,
     state: FSMContext,
-    user_row: Optional[UserModel],
+    lang_code: str,
 ) -> None:
-    lang_code = user_language(user_row, callback.from_user)
     await callback.answer()
-    choice = (callback.data or "").split(":", 2)[-1]
+    choice = (callback.data or "").rpartition(":")[2]
     if choice == "skip":
         if await state.get_state() == CourtClaimFlow.waiting_for_evidence:
             data = await state.get_data()
             await state.set_state(CourtClaimFlow.waiting_for_confirm)
             await callback.message.answer(
                 _build_confirmation(data, lang_code),
-                reply_markup=InlineKeyboardMarkup(
-                    inline_keyboard=[
-                        [
-                            InlineKeyboardButton(
-                                text=get_text("button.courts.confirm.send", lang_code),
-                                callback_data="courts:confirm:send",
-                            )
-                        ],
-                        [
-                            InlineKeyboardButton(
-                                text=get_text("button.courts.confirm.edit", lang_code),
-                                callback_data="courts:confirm:edit",
-                            )
-                        ],
-                        [
-                            InlineKeyboardButton(
-                                text=get_text("button.courts.confirm.cancel", lang_code),
-                                callback_data="courts:confirm:cancel",
-                            )
-                        ],
-                    ]
-                ),
+                reply_markup=_build_confirm_keyboard(lang_code),
             )
         else:
             await callback.message.answer(
@@ -1096,18 +1448,18 @@ async def handle_evidence_input(
     message: Message,
     state: FSMContext,
     db: DB,
-    user_row: Optional[UserModel],
+    lang_code: str,
 ) -> None:
-    lang_code = user_language(user_row, message.from_user)
     data = await state.get_data()
     mode = data.get("evidence_mode")
+    case_id = data.get("edit_case_id")
+    # Existing cases keep evidence in the database, which enforces the limit on append.
     evidence: list[dict[str, Any]] = data.get("evidence") or []
-    if len(evidence) >= EVIDENCE_LIMIT:
+    if not case_id and len(evidence) >= EVIDENCE_LIMIT:
         await message.answer(get_text("courts.error.evidence.limit", lang_code))
         return
     item: dict[str, Any] | None = None
     role = "plaintiff"
-    case_id = data.get("edit_case_id")
     if case_id:
         case = await db.court_cases.get_case_by_id(
             case_id=int(case_id),
@@ -1159,7 +1511,7 @@ async def handle_evidence_input(
         )
     elif mode == "link":
         text = (message.text or "").strip()
-        if not text or not re.match(r"^https?://", text):
+        if not text.startswith(_URL_PREFIXES):
             await message.answer(get_text("courts.error.evidence.link", lang_code))
             return
         item = _evidence_item(
@@ -1187,11 +1539,22 @@ async def handle_evidence_input(
     if item is None:
         await message.answer(get_text("courts.error.evidence.expected", lang_code))
         return
-    if item.get("text") and _contains_prohibited_content(str(item.get("text"))):
-        await message.answer(get_text("courts.error.evidence.blocked", lang_code))
-        return
     if case_id:
-        await db.court_cases.append_evidence(case_id=int(case_id), evidence_item=item)
+        appended = await db.court_cases.append_evidence(
+            case_id=int(case_id),
+            evidence_item=item,
+            limit=EVIDENCE_LIMIT,
+        )
+        if appended is None:
+            # The write refuses both full and closed cases; the failed write dropped the
+            # cached row, so this re-read sees the current status.
+            current = await db.court_cases.get_case_by_id(case_id=int(case_id))
+            if current is None or str(current.get("status") or "").lower() in _CLOSED_STATUSES:
+                await safe_state_clear(state)
+                await message.answer(get_text("courts.error.closed", lang_code))
+                return
+            await message.answer(get_text("courts.error.evidence.limit", lang_code))
+            return
         await message.answer(
             get_text("courts.evidence.added", lang_code),
             reply_markup=_build_evidence_keyboard(lang_code, include_skip=True),
@@ -1210,18 +1573,17 @@ async def handle_confirmation_action(
     callback: CallbackQuery,
     state: FSMContext,
     db: DB,
-    user_row: Optional[UserModel],
+    db_pool: AsyncConnectionPool,
+    lang_code: str,
 ) -> None:
-    lang_code = user_language(user_row, callback.from_user)
     await callback.answer()
-    action = (callback.data or "").split(":", 2)[-1]
+    action = (callback.data or "").rpartition(":")[2]
     if action == "cancel":
         await state.clear()
         await callback.message.answer(get_text("courts.confirm.cancelled", lang_code))
         return
     if action == "edit":
-        await state.clear()
-        await state.set_state(CourtClaimFlow.choosing_category)
+        await restart_state(state, CourtClaimFlow.choosing_category)
         await callback.message.answer(
             get_text("courts.step.category", lang_code),
             reply_markup=_build_category_keyboard(lang_code),
@@ -1239,29 +1601,29 @@ async def handle_confirmation_action(
         await state.set_state(CourtClaimFlow.waiting_for_claim)
         await callback.message.answer(get_text(message_key or "courts.sharia.clarify", lang_code))
         return
-    amount = data.get("amount")
-    if isinstance(amount, str):
-        amount = _parse_amount(amount)
+    amount = _normalize_amount(data.get("amount"))
     evidence = data.get("evidence") or []
-    invite_code = None
+    case_fields = {
+        "user_id": callback.from_user.id,
+        "plaintiff_id": callback.from_user.id,
+        "category": category,
+        "plaintiff": str(data.get("plaintiff_name") or "-"),
+        "defendant": str(data.get("defendant_name") or "-"),
+        "claim": claim_full,
+        "amount": amount,
+        "evidence": evidence,
+        "status": "open",
+        "sent_to_scholar": False,
+    }
+    # The unique index on invite_code rejects collisions inside the insert itself,
+    # so the common case is a single round-trip.
+    case = None
     for _ in range(5):
-        candidate = _generate_invite_code()
-        if not await db.court_cases.get_case_by_invite_code(invite_code=candidate):
-            invite_code = candidate
+        case = await db.court_cases.create_case(invite_code=_generate_invite_code(), **case_fields)
+        if case is not None:
             break
-    case = await db.court_cases.create_case(
-        user_id=callback.from_user.id,
-        plaintiff_id=callback.from_user.id,
-        invite_code=invite_code,
-        category=category,
-        plaintiff=str(data.get("plaintiff_name") or "-"),
-        defendant=str(data.get("defendant_name") or "-"),
-        claim=claim_full,
-        amount=amount if isinstance(amount, Decimal) or amount is None else None,
-        evidence=evidence,
-        status="open",
-        sent_to_scholar=False,
-    )
+    if case is None:
+        case = await db.court_cases.create_case(invite_code=None, **case_fields)
     await create_work_item(
         db,
         topic="courts",
@@ -1277,52 +1639,47 @@ async def handle_confirmation_action(
             "defendant": data.get("defendant_name"),
         },
     )
-    sent = await _forward_case_to_scholars(
-        bot=callback.bot,
-        lang_code=lang_code,
-        case=case,
-        user=callback.from_user,
+    await db.court_cases.claim_scholar_send(case_id=int(case.get("id") or 0))
+    _spawn_background(
+        _dispatch_case_to_scholars(
+            bot=callback.bot,
+            db_pool=db_pool,
+            lang_code=lang_code,
+            case=case,
+            user=callback.from_user,
+        )
     )
-    if sent:
-        await db.court_cases.mark_sent_to_scholar(case_id=int(case.get("id") or 0), sent=True)
     await state.clear()
-    await callback.message.answer(
-        get_text(
-            "courts.case.created",
-            lang_code,
-            case_number=case.get("case_number") or case.get("id"),
-        ),
-        reply_markup=build_inline_keyboard(INLINE_MENU_BY_KEY["menu.courts"], lang_code),
+    text = get_text(
+        "courts.case.created",
+        lang_code,
+        case_number=case.get("case_number") or case.get("id"),
     )
+    # The invite details ride along in the same message to save a Bot API round-trip.
     invite_code = case.get("invite_code")
     if invite_code:
-        username = await _resolve_bot_username(callback.bot)
+        username = await resolve_bot_username(callback.bot)
         if username:
-            invite_link = f"https://t.me/{username}?start={invite_code}"
-            await callback.message.answer(
-                get_text(
-                    "courts.invite.code",
-                    lang_code,
-                    invite_link=invite_link,
-                )
+            invite_text = get_text(
+                "courts.invite.code",
+                lang_code,
+                invite_link=f"https://t.me/{username}?start={invite_code}",
             )
         else:
-            await callback.message.answer(
-                get_text(
-                    "courts.invite.code.only",
-                    lang_code,
-                    invite_code=invite_code,
-                )
-            )
+            invite_text = get_text("courts.invite.code.only", lang_code, invite_code=invite_code)
+        text = f"{text}\n\n{invite_text}"
+    await callback.message.answer(
+        text,
+        reply_markup=build_inline_keyboard(INLINE_MENU_BY_KEY["menu.courts"], lang_code),
+    )
 
 
 @router.callback_query(F.data == "courts:opened")
 async def handle_opened_cases(
     callback: CallbackQuery,
     db: DB,
-    user_row: Optional[UserModel],
+    lang_code: str,
 ) -> None:
-    lang_code = user_language(user_row, callback.from_user)
     await callback.answer()
     cases = await db.court_cases.list_cases_by_status(
         user_id=callback.from_user.id, statuses=["open"]
@@ -1340,9 +1697,8 @@ async def handle_opened_cases(
 async def handle_in_progress_cases(
     callback: CallbackQuery,
     db: DB,
-    user_row: Optional[UserModel],
+    lang_code: str,
 ) -> None:
-    lang_code = user_language(user_row, callback.from_user)
     await callback.answer()
     cases = await db.court_cases.list_cases_by_status(
         user_id=callback.from_user.id, statuses=["in_progress"]
@@ -1360,9 +1716,8 @@ async def handle_in_progress_cases(
 async def handle_closed_cases(
     callback: CallbackQuery,
     db: DB,
-    user_row: Optional[UserModel],
+    lang_code: str,
 ) -> None:
-    lang_code = user_language(user_row, callback.from_user)
     await callback.answer()
     cases = await db.court_cases.list_cases_by_status(
         user_id=callback.from_user.id, statuses=["closed", "cancelled"]
@@ -1379,11 +1734,10 @@ async def handle_closed_cases(
 async def handle_case_details(
     callback: CallbackQuery,
     db: DB,
-    user_row: Optional[UserModel],
+    lang_code: str,
 ) -> None:
-    lang_code = user_language(user_row, callback.from_user)
     await callback.answer()
-    payload = (callback.data or "").split(":", 2)[-1]
+    payload = (callback.data or "").rpartition(":")[2]
     try:
         case_id = int(payload)
     except ValueError:
@@ -1396,302 +1750,295 @@ async def handle_case_details(
     role = _case_role(item, callback.from_user.id)
     is_plaintiff = role == "plaintiff"
     is_closed = str(item.get("status") or "").lower() in _CLOSED_STATUSES
-    inline_rows: list[list[InlineKeyboardButton]] = []
-    if not is_closed:
-        inline_rows.append(
-            [
-                InlineKeyboardButton(
-                    text=get_text("button.courts.details.add_evidence", lang_code),
-                    callback_data=f"courts:case:{case_id}:add_evidence",
-                )
-            ]
-        )
-    inline_rows.append(
+    inline_rows = [
         [
             InlineKeyboardButton(
-                text=get_text("button.courts.details.view_evidence", lang_code),
-                callback_data=f"courts:case:{case_id}:view_evidence",
+                text=text,
+                callback_data=f"courts:case:{case_id}:{action}" if action else "menu:menu.courts",
             )
         ]
+        for text, action in _case_details_buttons(lang_code, is_plaintiff, is_closed)
+    ]
+    keyboard = InlineKeyboardMarkup(inline_keyboard=inline_rows)
+    await callback.message.answer(_build_case_details(item, lang_code), reply_markup=keyboard)
+
+
+@dataclass(frozen=True)
+class _CaseActionContext:
+    callback: CallbackQuery
+    state: FSMContext
+    db: DB
+    db_pool: AsyncConnectionPool
+    lang_code: str
+    action: str
+    case_id: int
+    item: dict[str, Any]
+
+
+async def _case_add_evidence(ctx: _CaseActionContext) -> None:
+    await restart_state(
+        ctx.state,
+        CourtCaseEditFlow.waiting_for_evidence,
+        edit_case_id=ctx.case_id,
+        evidence_mode=None,
+    )
+    await ctx.callback.message.answer(
+        get_text("courts.step.evidence", ctx.lang_code),
+        reply_markup=_build_evidence_keyboard(ctx.lang_code, include_skip=True),
+    )
+
+
+async def _case_view_evidence(ctx: _CaseActionContext) -> None:
+    await _send_case_evidence(
+        bot=ctx.callback.bot,
+        message=ctx.callback.message,
+        lang_code=ctx.lang_code,
+        evidence=_case_evidence(ctx.item),
+    )
+
+
+async def _case_edit_claim(ctx: _CaseActionContext) -> None:
+    await restart_state(ctx.state, CourtCaseEditFlow.waiting_for_claim, edit_case_id=ctx.case_id)
+    await ctx.callback.message.answer(get_text("courts.edit.claim.prompt", ctx.lang_code))
+
+
+async def _case_edit_category(ctx: _CaseActionContext) -> None:
+    await restart_state(ctx.state, CourtCaseEditFlow.waiting_for_category, edit_case_id=ctx.case_id)
+    await ctx.callback.message.answer(
+        get_text("courts.step.category", ctx.lang_code),
+        reply_markup=_build_category_keyboard(ctx.lang_code),
     )
-    if is_plaintiff and not is_closed:
-        inline_rows.extend(
+
+
+async def _case_cancel(ctx: _CaseActionContext) -> None:
+    lang_code = ctx.lang_code
+    confirm_keyboard = InlineKeyboardMarkup(
+        inline_keyboard=[
             [
-                [
-                    InlineKeyboardButton(
-                        text=get_text("button.courts.details.edit_claim", lang_code),
-                        callback_data=f"courts:case:{case_id}:edit_claim",
-                    )
-                ],
-                [
-                    InlineKeyboardButton(
-                        text=get_text("button.courts.details.edit_category", lang_code),
-                        callback_data=f"courts:case:{case_id}:edit_category",
-                    )
-                ],
-                [
-                    InlineKeyboardButton(
-                        text=get_text("button.courts.details.cancel_case", lang_code),
-                        callback_data=f"courts:case:{case_id}:cancel",
-                    )
-                ],
-                [
-                    InlineKeyboardButton(
-                        text=get_text("button.courts.details.send_scholar", lang_code),
-                        callback_data=f"courts:case:{case_id}:send_scholar",
-                    )
-                ],
-                [
-                    InlineKeyboardButton(
-                        text=get_text("button.courts.details.invite", lang_code),
-                        callback_data=f"courts:case:{case_id}:invite",
-                    )
-                ],
+                InlineKeyboardButton(
+                    text=get_text("button.courts.details.cancel_confirm", lang_code),
+                    callback_data=f"courts:case:{ctx.case_id}:cancel_confirm",
+                ),
+                InlineKeyboardButton(
+                    text=get_text("button.courts.details.cancel_abort", lang_code),
+                    callback_data=f"courts:case:{ctx.case_id}:cancel_abort",
+                ),
             ]
-        )
-    inline_rows.append(
-        [
-            InlineKeyboardButton(
-                text=get_text("button.courts.details.mediate", lang_code),
-                callback_data=f"courts:case:{case_id}:mediate",
-            )
         ]
     )
-    inline_rows.append(
-        [
-            InlineKeyboardButton(
-                text=get_text("button.back", lang_code),
-                callback_data="menu:menu.courts",
-            )
-        ]
+    await ctx.callback.message.answer(
+        get_text("courts.case.cancel.confirm", lang_code),
+        reply_markup=confirm_keyboard,
     )
-    keyboard = InlineKeyboardMarkup(inline_keyboard=inline_rows)
-    await callback.message.answer(_build_case_details(item, lang_code), reply_markup=keyboard)
 
 
-@router.callback_query(F.data.startswith("courts:case:"))
-async def handle_case_action(
-    callback: CallbackQuery,
-    state: FSMContext,
-    db: DB,
-    user_row: Optional[UserModel],
-) -> None:
-    lang_code = user_language(user_row, callback.from_user)
-    parts = (callback.data or "").split(":")
-    if len(parts) < 4:
+async def _case_cancel_confirm(ctx: _CaseActionContext) -> None:
+    updated = await ctx.db.court_cases.update_status(case_id=ctx.case_id, status="cancelled")
+    if updated is None:
+        await ctx.callback.message.answer(get_text("courts.error.closed", ctx.lang_code))
         return
-    await callback.answer()
-    case_id = int(parts[2])
-    action = parts[3]
-    item = await db.court_cases.get_case_by_id(case_id=case_id, user_id=callback.from_user.id)
-    if not item:
-        await callback.message.answer(get_text("courts.case.not_found", lang_code))
+    await ctx.callback.message.answer(get_text("courts.case.cancelled", ctx.lang_code))
+
+
+async def _case_cancel_abort(ctx: _CaseActionContext) -> None:
+    await ctx.callback.message.answer(get_text("courts.case.cancel.aborted", ctx.lang_code))
+
+
+async def _case_send_scholar(ctx: _CaseActionContext) -> None:
+    callback, item, lang_code = ctx.callback, ctx.item, ctx.lang_code
+    if item.get("sent_to_scholar"):
+        await callback.message.answer(get_text("courts.case.already_sent", lang_code))
         return
-    role = _case_role(item, callback.from_user.id)
-    is_plaintiff = role == "plaintiff"
-    is_closed = str(item.get("status") or "").lower() in _CLOSED_STATUSES
-    if is_closed and action not in {"mediate", "mediate_join", "mediate_stop"}:
-        await callback.message.answer(get_text("courts.error.closed", lang_code))
+    claim = str(item.get("claim") or "")
+    verdict, message_key = _sharia_check(claim, str(item.get("category") or ""))
+    if verdict == "block":
+        await callback.message.answer(get_text(message_key or "courts.sharia.blocked", lang_code))
         return
-    if action == "add_evidence":
-        await state.clear()
-        await state.set_state(CourtCaseEditFlow.waiting_for_evidence)
-        await state.update_data(edit_case_id=case_id, evidence_mode=None)
-        await callback.message.answer(
-            get_text("courts.step.evidence", lang_code),
-            reply_markup=_build_evidence_keyboard(lang_code, include_skip=True),
-        )
+    if verdict == "clarify":
+        await callback.message.answer(get_text(message_key or "courts.sharia.clarify", lang_code))
         return
-    if action == "view_evidence":
-        evidence = item.get("evidence") or []
-        if isinstance(evidence, str):
-            try:
-                evidence = json.loads(evidence)
-            except json.JSONDecodeError:
-                evidence = []
-        await _send_case_evidence(
+    # The cached row can be stale and forwarding runs in the background, so the
+    # database decides which tap actually sends.
+    if not await ctx.db.court_cases.claim_scholar_send(case_id=ctx.case_id):
+        await callback.message.answer(get_text("courts.case.already_sent", lang_code))
+        return
+    _spawn_background(
+        _dispatch_case_to_scholars(
             bot=callback.bot,
-            message=callback.message,
+            db_pool=ctx.db_pool,
             lang_code=lang_code,
-            evidence=evidence,
+            case=item,
+            user=callback.from_user,
+            notify_chat_id=callback.message.chat.id,
         )
+    )
+
+
+@lru_cache(maxsize=1024)
+def _invite_share_message(
+    invite_code: str,
+    lang_code: str,
+    username: str,
+) -> tuple[str, InlineKeyboardMarkup]:
+    # Invite codes never change, so the link text and share keyboard are built once.
+    invite_link = f"https://t.me/{username}?start={invite_code}"
+    text = get_text(
+        "courts.invite.code",
+        lang_code,
+        invite_link=invite_link,
+    )
+    share_text = get_text(
+        "courts.invite.share.text",
+        lang_code,
+        invite_link=invite_link,
+    )
+    share_url = (
+        "https://t.me/share/url?url="
+        + quote_plus(invite_link)
+        + "&text="
+        + quote_plus(share_text)
+    )
+    keyboard = InlineKeyboardMarkup(
+        inline_keyboard=[
+            [
+                InlineKeyboardButton(
+                    text=get_text("button.courts.details.invite_share", lang_code),
+                    url=share_url,
+                )
+            ]
+        ]
+    )
+    return text, keyboard
+
+
+async def _case_invite(ctx: _CaseActionContext) -> None:
+    callback, item, lang_code = ctx.callback, ctx.item, ctx.lang_code
+    if item.get("defendant_id"):
+        await callback.message.answer(get_text("courts.invite.already_connected", lang_code))
         return
-    if action == "edit_claim":
-        if not is_plaintiff:
-            await callback.message.answer(get_text("courts.error.permission", lang_code))
-            return
-        await state.clear()
-        await state.set_state(CourtCaseEditFlow.waiting_for_claim)
-        await state.update_data(edit_case_id=case_id)
-        await callback.message.answer(get_text("courts.edit.claim.prompt", lang_code))
-        return
-    if action == "edit_category":
-        if not is_plaintiff:
-            await callback.message.answer(get_text("courts.error.permission", lang_code))
-            return
-        await state.clear()
-        await state.set_state(CourtCaseEditFlow.waiting_for_category)
-        await state.update_data(edit_case_id=case_id)
-        await callback.message.answer(
-            get_text("courts.step.category", lang_code),
-            reply_markup=_build_category_keyboard(lang_code),
-        )
+    invite_code = item.get("invite_code")
+    if not invite_code:
+        await callback.message.answer(get_text("courts.invite.missing", lang_code))
         return
-    if action == "cancel":
-        if not is_plaintiff:
-            await callback.message.answer(get_text("courts.error.permission", lang_code))
-            return
-        confirm_keyboard = InlineKeyboardMarkup(
-            inline_keyboard=[
-                [
-                    InlineKeyboardButton(
-                        text=get_text("button.courts.details.cancel_confirm", lang_code),
-                        callback_data=f"courts:case:{case_id}:cancel_confirm",
-                    ),
-                    InlineKeyboardButton(
-                        text=get_text("button.courts.details.cancel_abort", lang_code),
-                        callback_data=f"courts:case:{case_id}:cancel_abort",
-                    ),
-                ]
-            ]
+    username = await resolve_bot_username(callback.bot)
+    if username:
+        text, keyboard = _invite_share_message(str(invite_code), lang_code, username)
+        await callback.message.answer(text, reply_markup=keyboard)
+    else:
+        text = get_text(
+            "courts.invite.code.only",
+            lang_code,
+            invite_code=invite_code,
         )
-        await callback.message.answer(
-            get_text("courts.case.cancel.confirm", lang_code),
-            reply_markup=confirm_keyboard,
+        await callback.message.answer(text)
+
+
+async def _case_mediate(ctx: _CaseActionContext) -> None:
+    callback, item, lang_code, case_id = ctx.callback, ctx.item, ctx.lang_code, ctx.case_id
+    await ctx.state.set_state(CourtCaseMediateFlow.active)
+    await ctx.state.update_data(_mediate_state(item, callback.from_user.id))
+    if ctx.action == "mediate":
+        greeting = get_text("courts.case.mediate.start", lang_code)
+    else:
+        greeting = get_text(
+            "courts.case.mediate.joined",
+            lang_code,
+            case_number=item.get("case_number") or case_id,
         )
-        return
-    if action == "cancel_confirm":
-        if not is_plaintiff:
-            await callback.message.answer(get_text("courts.error.permission", lang_code))
-            return
-        await db.court_cases.update_status(case_id=case_id, status="cancelled")
-        await callback.message.answer(get_text("courts.case.cancelled", lang_code))
-        return
-    if action == "cancel_abort":
-        await callback.message.answer(get_text("courts.case.cancel.aborted", lang_code))
-        return
-    if action == "send_scholar":
-        if not is_plaintiff:
-            await callback.message.answer(get_text("courts.error.permission", lang_code))
-            return
-        if item.get("sent_to_scholar"):
-            await callback.message.answer(get_text("courts.case.already_sent", lang_code))
-            return
-        claim = str(item.get("claim") or "")
-        verdict, message_key = _sharia_check(claim, str(item.get("category") or ""))
-        if verdict == "block":
-            await callback.message.answer(get_text(message_key or "courts.sharia.blocked", lang_code))
-            return
-        if verdict == "clarify":
-            await callback.message.answer(get_text(message_key or "courts.sharia.clarify", lang_code))
-            return
-        sent = await _forward_case_to_scholars(
+    await callback.message.answer(
+        greeting,
+        reply_markup=_build_mediate_keyboard(lang_code, case_id=case_id, mode="stop"),
+    )
+    if ctx.action == "mediate":
+        await _notify_mediate_start(
             bot=callback.bot,
-            lang_code=lang_code,
             case=item,
-            user=callback.from_user,
+            initiator=callback.from_user,
+            lang_code=lang_code,
         )
-        if sent:
-            await db.court_cases.mark_sent_to_scholar(case_id=case_id, sent=True)
-            await callback.message.answer(get_text("courts.case.sent_to_scholar", lang_code))
-        else:
-            await callback.message.answer(get_text("courts.file.unavailable", lang_code))
+    await _send_mediate_history(
+        bot=callback.bot,
+        chat_id=callback.from_user.id,
+        log=_normalize_mediate_log(item.get("mediate_log")),
+        lang_code=lang_code,
+    )
+
+
+async def _case_mediate_stop(ctx: _CaseActionContext) -> None:
+    await _finalize_mediate_chat(
+        bot=ctx.callback.bot,
+        db=ctx.db,
+        case_id=ctx.case_id,
+        lang_code=ctx.lang_code,
+        notify_chat_id=ctx.callback.from_user.id,
+    )
+    await safe_state_clear(ctx.state)
+    await ctx.callback.message.answer(get_text("courts.case.mediate.stopped", ctx.lang_code))
+
+
+# action -> (handler, plaintiff only, allowed on closed cases)
+_CASE_ACTIONS: dict[str, tuple[Callable[[_CaseActionContext], Awaitable[None]], bool, bool]] = {
+    "add_evidence": (_case_add_evidence, False, False),
+    "view_evidence": (_case_view_evidence, False, False),
+    "edit_claim": (_case_edit_claim, True, False),
+    "edit_category": (_case_edit_category, True, False),
+    "cancel": (_case_cancel, True, False),
+    "cancel_confirm": (_case_cancel_confirm, True, False),
+    "cancel_abort": (_case_cancel_abort, False, False),
+    "send_scholar": (_case_send_scholar, True, False),
+    "invite": (_case_invite, True, False),
+    "mediate": (_case_mediate, False, True),
+    "mediate_join": (_case_mediate, False, True),
+    "mediate_stop": (_case_mediate_stop, False, True),
+}
+
+
+@router.callback_query(F.data.startswith("courts:case:"))
+async def handle_case_action(
+    callback: CallbackQuery,
+    state: FSMContext,
+    db: DB,
+    db_pool: AsyncConnectionPool,
+    lang_code: str,
+) -> None:
+    match = _CASE_ACTION_RE.fullmatch(callback.data or "")
+    if match is None:
         return
-    if action == "invite":
-        if not is_plaintiff:
-            await callback.message.answer(get_text("courts.error.permission", lang_code))
-            return
-        if item.get("defendant_id"):
-            await callback.message.answer(get_text("courts.invite.already_connected", lang_code))
-            return
-        invite_code = item.get("invite_code")
-        if not invite_code:
-            await callback.message.answer(get_text("courts.invite.missing", lang_code))
-            return
-        username = await _resolve_bot_username(callback.bot)
-        if username:
-            invite_link = f"https://t.me/{username}?start={invite_code}"
-            text = get_text(
-                "courts.invite.code",
-                lang_code,
-                invite_link=invite_link,
-            )
-            share_text = get_text(
-                "courts.invite.share.text",
-                lang_code,
-                invite_link=invite_link,
-            )
-            share_url = (
-                "https://t.me/share/url?url="
-                + quote_plus(invite_link)
-                + "&text="
-                + quote_plus(share_text)
-            )
-            keyboard = InlineKeyboardMarkup(
-                inline_keyboard=[
-                    [
-                        InlineKeyboardButton(
-                            text=get_text("button.courts.details.invite_share", lang_code),
-                            url=share_url,
-                        )
-                    ]
-                ]
-            )
-            await callback.message.answer(text, reply_markup=keyboard)
-        else:
-            text = get_text(
-                "courts.invite.code.only",
-                lang_code,
-                invite_code=invite_code,
-            )
-            await callback.message.answer(text)
+    await callback.answer()
+    case_id = int(match.group(1))
+    action = match.group(2)
+    entry = _CASE_ACTIONS.get(action)
+    if entry is None:
         return
-    if action in {"mediate", "mediate_join"}:
-        await state.set_state(CourtCaseMediateFlow.active)
-        await state.update_data(mediate_case_id=case_id)
-        if action == "mediate":
-            await callback.message.answer(
-                get_text("courts.case.mediate.start", lang_code),
-                reply_markup=_build_mediate_keyboard(lang_code, case_id=case_id, mode="stop"),
-            )
-            await _notify_mediate_start(
-                bot=callback.bot,
-                case=item,
-                initiator=callback.from_user,
-                lang_code=lang_code,
-            )
-            history = _normalize_mediate_log(item.get("mediate_log"))
-            await _send_mediate_history(
-                bot=callback.bot,
-                chat_id=callback.from_user.id,
-                log=history,
-                lang_code=lang_code,
-            )
-        else:
-            case_number = item.get("case_number") or case_id
-            await callback.message.answer(
-                get_text("courts.case.mediate.joined", lang_code, case_number=case_number),
-                reply_markup=_build_mediate_keyboard(lang_code, case_id=case_id, mode="stop"),
-            )
-            history = _normalize_mediate_log(item.get("mediate_log"))
-            await _send_mediate_history(
-                bot=callback.bot,
-                chat_id=callback.from_user.id,
-                log=history,
-                lang_code=lang_code,
-            )
+    handler, plaintiff_only, allowed_when_closed = entry
+    item = await db.court_cases.get_case_by_id(case_id=case_id, user_id=callback.from_user.id)
+    if not item:
+        await callback.message.answer(get_text("courts.case.not_found", lang_code))
         return
-    if action == "mediate_stop":
-        await _finalize_mediate_chat(
-            bot=callback.bot,
+    is_closed = str(item.get("status") or "").lower() in _CLOSED_STATUSES
+    if is_closed and not allowed_when_closed:
+        await callback.message.answer(get_text("courts.error.closed", lang_code))
+        return
+    if plaintiff_only and _case_role(item, callback.from_user.id) != "plaintiff":
+        await callback.message.answer(get_text("courts.error.permission", lang_code))
+        return
+    await handler(
+        _CaseActionContext(
+            callback=callback,
+            state=state,
             db=db,
-            case_id=case_id,
+            db_pool=db_pool,
             lang_code=lang_code,
-            notify_chat_id=callback.from_user.id,
+            action=action,
+            case_id=case_id,
+            item=item,
         )
-        await safe_state_clear(state)
-        await callback.message.answer(get_text("courts.case.mediate.stopped", lang_code))
-        return
+    )
+
+
+async def _end_mediate(state: FSMContext, message: Message, text: str) -> None:
+    # Clearing the FSM and replying are independent round-trips.
+    await asyncio.gather(safe_state_clear(state), message.answer(text))
 
 
 @router.message(CourtCaseMediateFlow.active)
@@ -1699,12 +2046,12 @@ async def handle_mediate_message(
     message: Message,
     state: FSMContext,
     db: DB,
-    user_row: Optional[UserModel],
+    db_pool: AsyncConnectionPool,
+    lang_code: str,
 ) -> None:
-    lang_code = user_language(user_row, message.from_user)
+    data = await state.get_data()
+    case_id = int(data.get("mediate_case_id") or 0)
     if is_cancel_command(message.text):
-        data = await state.get_data()
-        case_id = int(data.get("mediate_case_id") or 0)
         if case_id:
             await _finalize_mediate_chat(
                 bot=message.bot,
@@ -1713,66 +2060,45 @@ async def handle_mediate_message(
                 lang_code=lang_code,
                 notify_chat_id=message.chat.id,
             )
-        await safe_state_clear(state)
-        await message.answer(get_text("courts.case.mediate.stopped", lang_code))
+        await _end_mediate(state, message, get_text("courts.case.mediate.stopped", lang_code))
         return
-    data = await state.get_data()
-    case_id = int(data.get("mediate_case_id") or 0)
     if not case_id:
-        await safe_state_clear(state)
-        await message.answer(get_text("courts.case.not_found", lang_code))
-        return
-    item = await db.court_cases.get_case_by_id(case_id=case_id, user_id=message.from_user.id)
-    if not item:
-        await safe_state_clear(state)
-        await message.answer(get_text("courts.case.not_found", lang_code))
+        await _end_mediate(state, message, get_text("courts.case.not_found", lang_code))
         return
-    recipients = _case_participants(item)
-    scholar_id = _resolve_scholar_observer(item)
-    if scholar_id:
-        recipients.add(scholar_id)
-    recipients.discard(int(message.from_user.id))
+    recipients = data.get("mediate_recipients")
+    recipients_at = float(data.get("mediate_recipients_at") or 0)
+    if recipients is None or time.time() - recipients_at > _MEDIATE_RECIPIENTS_TTL_SEC:
+        item = await db.court_cases.get_case_by_id(case_id=case_id, user_id=message.from_user.id)
+        if not item:
+            await _end_mediate(state, message, get_text("courts.case.not_found", lang_code))
+            return
+        mediate_state = _mediate_state(item, message.from_user.id)
+        recipients = mediate_state["mediate_recipients"]
+        await state.update_data(mediate_state)
     if not recipients:
         await message.answer(get_text("courts.case.mediate.no_recipients", lang_code))
         return
 
+    sender = message.from_user
+    # Same result as User.full_name, without the concatenation when there is no last name.
     sender_name = (
-        message.from_user.full_name
-        or message.from_user.username
+        (f"{sender.first_name} {sender.last_name}" if sender.last_name else sender.first_name)
+        or sender.username
         or get_text("user.default_name", lang_code)
     )
     text = (message.text or "").strip()
     if text:
         payload = get_text("courts.case.mediate.forward", lang_code, name=sender_name, text=text)
-        for recipient_id in recipients:
-            try:
-                await message.bot.send_message(chat_id=int(recipient_id), text=payload)
-            except Exception:
-                logger.exception("Failed to forward mediate text to %s", recipient_id)
-        await db.court_cases.append_mediate_log(
-            case_id=case_id,
-            entry={
-                "ts": datetime.now(timezone.utc).isoformat(timespec="seconds"),
-                "name": sender_name,
-                "text": text,
-                "kind": "text",
-            },
+        await _fan_out(
+            recipients,
+            lambda recipient_id: _retry_after(lambda: message.bot.send_message(chat_id=recipient_id, text=payload)),
+            error_message="Failed to forward mediate text to %s",
         )
+        _queue_mediate_log(db_pool, case_id, _mediate_log_entry(kind="text", name=sender_name, text=text))
         return
 
     caption = (message.caption or "").strip()
-    has_media = any(
-        [
-            message.photo,
-            message.document,
-            message.audio,
-            message.voice,
-            message.video,
-            message.video_note,
-            message.animation,
-            message.sticker,
-        ]
-    )
+    has_media = any(getattr(message, attr, None) for attr in _MEDIA_ATTRS)
     if not has_media:
         await message.answer(get_text("courts.case.mediate.unsupported", lang_code))
         return
@@ -1782,40 +2108,47 @@ async def handle_mediate_message(
         name=sender_name,
         caption=caption,
     )
-    for recipient_id in recipients:
-        try:
-            if header:
-                await message.bot.send_message(chat_id=int(recipient_id), text=header)
-            await message.copy_to(chat_id=int(recipient_id))
-        except Exception:
-            logger.exception("Failed to forward mediate media to %s", recipient_id)
-    await db.court_cases.append_mediate_log(
-        case_id=case_id,
-        entry={
-            "ts": datetime.now(timezone.utc).isoformat(timespec="seconds"),
-            "name": sender_name,
-            "text": caption,
-            "kind": "media",
-        },
+    # Captionable media carry the header as their caption: one API call per recipient.
+    header_as_caption = (
+        bool(header)
+        and len(header) <= _CAPTION_LIMIT
+        and not (message.sticker or message.video_note)
     )
 
+    bot = message.bot
+    source = {"from_chat_id": message.chat.id, "message_id": message.message_id}
+
+    async def forward_media(recipient_id: int) -> None:
+        if header_as_caption:
+            await _retry_after(lambda: bot.copy_message(chat_id=recipient_id, caption=header, **source))
+            return
+        # The header must land before the media in each chat; chats run in parallel.
+        if header:
+            await _retry_after(lambda: bot.send_message(chat_id=recipient_id, text=header))
+        await _retry_after(lambda: bot.copy_message(chat_id=recipient_id, **source))
+
+    await _fan_out(recipients, forward_media, error_message="Failed to forward mediate media to %s")
+    _queue_mediate_log(db_pool, case_id, _mediate_log_entry(kind="media", name=sender_name, text=caption))
+
 
 @router.message(CourtCaseEditFlow.waiting_for_claim)
 async def handle_edit_claim(
     message: Message,
     state: FSMContext,
     db: DB,
-    user_row: Optional[UserModel],
+    lang_code: str,
 ) -> None:
-    lang_code = user_language(user_row, message.from_user)
     text = (message.text or "").strip()
     if not text:
         await message.answer(get_text("courts.error.claim.empty", lang_code))
         return
     data = await state.get_data()
     case_id = int(data.get("edit_case_id") or 0)
-    await db.court_cases.update_claim(case_id=case_id, claim=text)
+    updated = await db.court_cases.update_claim(case_id=case_id, claim=text)
     await state.clear()
+    if updated is None:
+        await message.answer(get_text("courts.error.closed", lang_code))
+        return
     await message.answer(get_text("courts.edit.claim.saved", lang_code))
 
 
@@ -1824,16 +2157,18 @@ async def handle_edit_category(
     callback: CallbackQuery,
     state: FSMContext,
     db: DB,
-    user_row: Optional[UserModel],
+    lang_code: str,
 ) -> None:
-    lang_code = user_language(user_row, callback.from_user)
     await callback.answer()
-    slug = (callback.data or "").split(":", 2)[-1].strip()
+    slug = (callback.data or "").rpartition(":")[2].strip()
     if slug not in CATEGORY_KEYS:
         await callback.answer(get_text("error.request.invalid", lang_code), show_alert=True)
         return
     data = await state.get_data()
     case_id = int(data.get("edit_case_id") or 0)
-    await db.court_cases.update_category(case_id=case_id, category=slug)
+    updated = await db.court_cases.update_category(case_id=case_id, category=slug)
     await state.clear()
+    if updated is None:
+        await callback.message.answer(get_text("courts.error.closed", lang_code))
+        return
     await callback.message.answer(get_text("courts.edit.category.saved", lang_code))
@@ -1,15 +1,14 @@
 from __future__ import annotations
 
-import json
 import logging
 from decimal import Decimal, InvalidOperation
-from typing import Any, Iterable, Optional
+from typing import Any, Callable, Iterable, Optional, Sequence
 
 from aiogram import F, Router
 from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup, Message
 
-from app.bot.handlers.comitee_common import is_cancel_command, user_language
+from app.bot.handlers.comitee_common import is_cancel_command, loads_json, restart_state
 from app.bot.states.comitee import (
     GoodDeedClarifyFlow,
     GoodDeedConfirmationFlow,
@@ -18,7 +17,6 @@ from app.bot.states.comitee import (
     GoodDeedNeedyFlow,
 )
 from app.infrastructure.database.db import DB
-from app.infrastructure.database.models.user import UserModel
 from app.infrastructure.database.tables.good_deeds import GoodDeedsTable
 from app.services.i18n.localization import get_text
 
@@ -28,6 +26,9 @@ router = Router(name="comitee.good_deeds")
 
 PUBLIC_STATUSES = ("approved", "in_progress", "completed")
 EDITABLE_STATUSES = ("pending", "needs_clarification")
+_OPEN_DEED_STATUSES = frozenset({"approved", "in_progress"})
+_PERSON_TYPES = frozenset({"person", "family"})
+_YES_NO = frozenset({"yes", "no"})
 
 HELP_TYPE_LABELS = {
     "sadaqa": "🤲 Садака",
@@ -42,57 +43,72 @@ APPROVED_CATEGORY_LABELS = {
 }
 
 
+STATUS_LABELS = {
+    "pending": "⏳ На проверке",
+    "needs_clarification": "✏️ Требует уточнения",
+    "approved": "✅ Одобрено",
+    "in_progress": "🕊 В процессе",
+    "completed": "🏁 Завершено",
+    "rejected": "❌ Отклонено",
+}
+
+
 def _status_label(status: str) -> str:
-    mapping = {
-        "pending": "⏳ На проверке",
-        "needs_clarification": "✏️ Требует уточнения",
-        "approved": "✅ Одобрено",
-        "in_progress": "🕊 В процессе",
-        "completed": "🏁 Завершено",
-        "rejected": "❌ Отклонено",
-    }
-    return mapping.get(status, status or "-")
+    return STATUS_LABELS.get(status, status or "-")
+
+
+_AMOUNT_SKIP_WORDS = frozenset({"-", "нет", "no", "n"})
 
 
 def _parse_amount(value: Optional[str]) -> Optional[Decimal]:
     if value is None:
         return None
-    text = value.strip().lower()
-    if not text or text in {"-", "нет", "no", "n"}:
+    text = value.strip()
+    if not text or text.lower() in _AMOUNT_SKIP_WORDS:
         return None
-    text = text.replace(",", ".")
+    if "," in text:
+        text = text.replace(",", ".")
     try:
         return Decimal(text)
     except (InvalidOperation, ValueError):
         return None
 
 
+def _history_field(value: Any) -> str:
+    # History is written by this bot, so fields are normally strings already.
+    if isinstance(value, str):
+        return value.strip()
+    return str(value or "").strip()
+
+
 def _format_history(history: Any) -> str:
     if not history:
         return ""
-    if isinstance(history, str):
+    # JSONB columns arrive already decoded as a list; strings are only parsed as a fallback.
+    if isinstance(history, (str, bytes)):
         try:
-            parsed = json.loads(history)
-        except Exception:
-            parsed = []
-    else:
-        parsed = history
-    if isinstance(parsed, dict):
-        items = [parsed]
-    elif isinstance(parsed, list):
-        items = [item for item in parsed if isinstance(item, dict)]
+            history = loads_json(history)
+        except ValueError:
+            return ""
+    if isinstance(history, dict):
+        items = (history,)
+    elif isinstance(history, list):
+        items = history
     else:
-        items = []
+        return ""
     lines: list[str] = []
     for item in items:
-        at = str(item.get("at") or "").strip() or "-"
-        action = str(item.get("action") or "").strip()
-        status = str(item.get("status") or "").strip()
-        parts = [part for part in (action, status) if part]
-        line = f"- {at}"
-        if parts:
-            line = f"{line}: {' / '.join(parts)}"
-        lines.append(line)
+        if not isinstance(item, dict):
+            continue
+        at = _history_field(item.get("at")) or "-"
+        action = _history_field(item.get("action"))
+        status = _history_field(item.get("status"))
+        if action and status:
+            lines.append(f"- {at}: {action} / {status}")
+        elif action or status:
+            lines.append(f"- {at}: {action or status}")
+        else:
+            lines.append(f"- {at}")
     return "\n".join(lines)
 
 
@@ -100,7 +116,8 @@ def _deed_brief(deed: dict[str, Any]) -> str:
     title = deed.get("title") or "Без названия"
     city = deed.get("city") or "-"
     country = deed.get("country") or "-"
-    status = _status_label(str(deed.get("status") or ""))
+    status = deed.get("status")
+    status = STATUS_LABELS.get(status, status) if status else "-"
     return f"{title} — {city}, {country} ({status})"
 
 
@@ -108,14 +125,25 @@ def _needy_brief(needy: dict[str, Any]) -> str:
     p_type = needy.get("person_type") or "-"
     city = needy.get("city") or "-"
     country = needy.get("country") or "-"
-    status = _status_label(str(needy.get("status") or ""))
+    status = needy.get("status")
+    status = STATUS_LABELS.get(status, status) if status else "-"
     return f"{p_type} — {city}, {country} ({status})"
 
 
-def _build_list_keyboard(items: Iterable[dict[str, Any]], prefix: str) -> InlineKeyboardMarkup:
+_BACK_BTN = InlineKeyboardButton(text="↩️ Назад", callback_data="menu:menu.good_deeds")
+_BACK_ROW = [_BACK_BTN]
+
+
+def _numbered_lines(items: Iterable[dict[str, Any]], brief: Callable[[dict[str, Any]], str]) -> str:
+    return "\n".join([f"{number}. {brief(item)}" for number, item in enumerate(items, 1)])
+
+
+def _build_list_keyboard(items: Sequence[dict[str, Any]], prefix: str) -> InlineKeyboardMarkup:
     rows: list[list[InlineKeyboardButton]] = []
     for item in items:
-        item_id = int(item.get("id") or 0)
+        item_id = item.get("id") or 0
+        if type(item_id) is not int:  # DB rows already carry ints; only coerce other shapes
+            item_id = int(item_id)
         label = item.get("title") or item.get("person_type") or f"#{item_id}"
         rows.append(
             [
@@ -125,59 +153,104 @@ def _build_list_keyboard(items: Iterable[dict[str, Any]], prefix: str) -> Inline
                 )
             ]
         )
-    rows.append([InlineKeyboardButton(text="↩️ Назад", callback_data="menu:menu.good_deeds")])
+    rows.append(_BACK_ROW)
     return InlineKeyboardMarkup(inline_keyboard=rows)
 
 
-def _build_help_type_keyboard() -> InlineKeyboardMarkup:
-    rows = [
+# Static keyboards are built once; aiogram serializes markup per request, so sharing them is safe.
+_HELP_TYPE_KB = InlineKeyboardMarkup(
+    inline_keyboard=[
         [InlineKeyboardButton(text=HELP_TYPE_LABELS["sadaqa"], callback_data="good_deeds:type:sadaqa")],
         [InlineKeyboardButton(text=HELP_TYPE_LABELS["zakat"], callback_data="good_deeds:type:zakat")],
         [InlineKeyboardButton(text=HELP_TYPE_LABELS["fitr"], callback_data="good_deeds:type:fitr")],
         [InlineKeyboardButton(text=HELP_TYPE_LABELS["general"], callback_data="good_deeds:type:general")],
+        _BACK_ROW,
     ]
-    rows.append([InlineKeyboardButton(text="↩️ Назад", callback_data="menu:menu.good_deeds")])
-    return InlineKeyboardMarkup(inline_keyboard=rows)
-
-
-def _build_category_keyboard() -> InlineKeyboardMarkup:
-    rows = [
+)
+_CATEGORY_KB = InlineKeyboardMarkup(
+    inline_keyboard=[
         [InlineKeyboardButton(text=APPROVED_CATEGORY_LABELS["zakat"], callback_data="good_deeds:cat:zakat")],
         [InlineKeyboardButton(text=APPROVED_CATEGORY_LABELS["fitr"], callback_data="good_deeds:cat:fitr")],
         [InlineKeyboardButton(text=APPROVED_CATEGORY_LABELS["sadaqa"], callback_data="good_deeds:cat:sadaqa")],
+        _BACK_ROW,
     ]
-    rows.append([InlineKeyboardButton(text="↩️ Назад", callback_data="menu:menu.good_deeds")])
-    return InlineKeyboardMarkup(inline_keyboard=rows)
+)
+_BACK_ONLY_KB = InlineKeyboardMarkup(inline_keyboard=[_BACK_ROW])
+_NEEDY_ADD_KB = InlineKeyboardMarkup(
+    inline_keyboard=[
+        [InlineKeyboardButton(text="➕ Добавить нуждающегося", callback_data="good_deeds:needy:add")],
+        _BACK_ROW,
+    ]
+)
+_PERSON_TYPE_KB = InlineKeyboardMarkup(
+    inline_keyboard=[
+        [InlineKeyboardButton(text="🙋 Человек", callback_data="good_deeds:needy:type:person")],
+        [InlineKeyboardButton(text="👨‍👩‍👧‍👦 Семья", callback_data="good_deeds:needy:type:family")],
+    ]
+)
+_ZAKAT_KB = InlineKeyboardMarkup(
+    inline_keyboard=[
+        [InlineKeyboardButton(text="✅ Да", callback_data="good_deeds:needy:zakat:yes")],
+        [InlineKeyboardButton(text="❌ Нет", callback_data="good_deeds:needy:zakat:no")],
+    ]
+)
+_FITR_KB = InlineKeyboardMarkup(
+    inline_keyboard=[
+        [InlineKeyboardButton(text="✅ Да", callback_data="good_deeds:needy:fitr:yes")],
+        [InlineKeyboardButton(text="❌ Нет", callback_data="good_deeds:needy:fitr:no")],
+    ]
+)
+_DEED_CONFIRM_KB = InlineKeyboardMarkup(
+    inline_keyboard=[
+        [InlineKeyboardButton(text="✅ Отправить на проверку", callback_data="good_deeds:submit")],
+        [InlineKeyboardButton(text="❌ Отмена", callback_data="good_deeds:cancel")],
+    ]
+)
+_NEEDY_CONFIRM_KB = InlineKeyboardMarkup(
+    inline_keyboard=[
+        [InlineKeyboardButton(text="✅ Отправить на проверку", callback_data="good_deeds:needy:submit")],
+        [InlineKeyboardButton(text="❌ Отмена", callback_data="good_deeds:cancel")],
+    ]
+)
+
+
+async def _read_text(message: Message, state: FSMContext, lang_code: str, prompt_key: str) -> Optional[str]:
+    # None means the handler should stop: the flow was cancelled or the prompt was repeated.
+    if is_cancel_command(message.text):
+        await state.clear()
+        await message.answer(get_text("good_deeds.cancelled", lang_code))
+        return None
+    text = (message.text or "").strip()
+    if not text:
+        await message.answer(get_text(prompt_key, lang_code))
+        return None
+    return text
 
 
 @router.callback_query(F.data == "good_deeds:list")
 async def handle_good_deeds_list(
     callback: CallbackQuery,
-    user_row: Optional[UserModel],
+    lang_code: str,
     db: DB,
 ) -> None:
     await callback.answer()
-    lang_code = user_language(user_row, callback.from_user)
     deeds = await db.good_deeds.list_public_good_deeds(statuses=PUBLIC_STATUSES, limit=15)
     if not deeds:
         await callback.message.answer(get_text("good_deeds.list.empty", lang_code))
         return
-    text = "🟢 Актуальные добрые дела:\n\n" + "\n".join(
-        f"{idx + 1}. {_deed_brief(deed)}" for idx, deed in enumerate(deeds)
-    )
+    text = "🟢 Актуальные добрые дела:\n\n" + _numbered_lines(deeds, _deed_brief)
     await callback.message.answer(text, reply_markup=_build_list_keyboard(deeds, "good_deeds:view"))
 
 
 @router.callback_query(F.data.startswith("good_deeds:view:"))
 async def handle_good_deed_view(
     callback: CallbackQuery,
-    user_row: Optional[UserModel],
+    lang_code: str,
     db: DB,
 ) -> None:
     await callback.answer()
-    lang_code = user_language(user_row, callback.from_user)
     try:
-        deed_id = int((callback.data or "").split(":")[-1])
+        deed_id = int((callback.data or "").rpartition(":")[2])
     except ValueError:
         await callback.message.answer(get_text("error.request.invalid", lang_code))
         return
@@ -215,7 +288,7 @@ async def handle_good_deed_view(
     if history_text:
         text = f"{text}\n\n{get_text('good_deeds.history.title', lang_code)}\n{history_text}"
     buttons: list[list[InlineKeyboardButton]] = []
-    if status in {"approved", "in_progress"}:
+    if status in _OPEN_DEED_STATUSES:
         buttons.append(
             [InlineKeyboardButton(text="✅ Подтвердить помощь", callback_data=f"good_deeds:confirm:{deed_id}")]
         )
@@ -223,25 +296,25 @@ async def handle_good_deed_view(
         buttons.append(
             [InlineKeyboardButton(text="✏️ Уточнить", callback_data=f"good_deeds:clarify:{deed_id}")]
         )
-    buttons.append([InlineKeyboardButton(text="↩️ Назад", callback_data="menu:menu.good_deeds")])
+    if not buttons:
+        await callback.message.answer(text, reply_markup=_BACK_ONLY_KB)
+        return
+    buttons.append(_BACK_ROW)
     await callback.message.answer(text, reply_markup=InlineKeyboardMarkup(inline_keyboard=buttons))
 
 
 @router.callback_query(F.data == "good_deeds:my")
 async def handle_good_deeds_my(
     callback: CallbackQuery,
-    user_row: Optional[UserModel],
+    lang_code: str,
     db: DB,
 ) -> None:
     await callback.answer()
-    lang_code = user_language(user_row, callback.from_user)
     deeds = await db.good_deeds.list_good_deeds_by_user(user_id=callback.from_user.id, limit=20)
     if not deeds:
         await callback.message.answer(get_text("good_deeds.my.empty", lang_code))
         return
-    text = "📌 Мои добрые дела:\n\n" + "\n".join(
-        f"{idx + 1}. {_deed_brief(deed)}" for idx, deed in enumerate(deeds)
-    )
+    text = "📌 Мои добрые дела:\n\n" + _numbered_lines(deeds, _deed_brief)
     await callback.message.answer(text, reply_markup=_build_list_keyboard(deeds, "good_deeds:view"))
 
 
@@ -249,10 +322,9 @@ async def handle_good_deeds_my(
 async def handle_good_deeds_city_prompt(
     callback: CallbackQuery,
     state: FSMContext,
-    user_row: Optional[UserModel],
+    lang_code: str,
 ) -> None:
     await callback.answer()
-    lang_code = user_language(user_row, callback.from_user)
     await state.set_state(GoodDeedLocationFilterFlow.waiting_for_query)
     await callback.message.answer(get_text("good_deeds.prompt.location", lang_code))
 
@@ -261,10 +333,9 @@ async def handle_good_deeds_city_prompt(
 async def handle_good_deeds_city_search(
     message: Message,
     state: FSMContext,
-    user_row: Optional[UserModel],
+    lang_code: str,
     db: DB,
 ) -> None:
-    lang_code = user_language(user_row, message.from_user)
     if is_cancel_command(message.text):
         await state.clear()
         await message.answer(get_text("good_deeds.cancelled", lang_code))
@@ -282,34 +353,30 @@ async def handle_good_deeds_city_search(
     if not deeds:
         await message.answer(get_text("good_deeds.list.empty", lang_code))
         return
-    text = f"📍 Добрые дела по запросу \"{query}\":\n\n" + "\n".join(
-        f"{idx + 1}. {_deed_brief(deed)}" for idx, deed in enumerate(deeds)
-    )
+    text = f"📍 Добрые дела по запросу \"{query}\":\n\n" + _numbered_lines(deeds, _deed_brief)
     await message.answer(text, reply_markup=_build_list_keyboard(deeds, "good_deeds:view"))
 
 
 @router.callback_query(F.data == "good_deeds:category")
 async def handle_good_deeds_category_menu(
     callback: CallbackQuery,
-    user_row: Optional[UserModel],
+    lang_code: str,
 ) -> None:
     await callback.answer()
-    lang_code = user_language(user_row, callback.from_user)
     await callback.message.answer(
         get_text("good_deeds.prompt.category", lang_code),
-        reply_markup=_build_category_keyboard(),
+        reply_markup=_CATEGORY_KB,
     )
 
 
 @router.callback_query(F.data.startswith("good_deeds:cat:"))
 async def handle_good_deeds_category_list(
     callback: CallbackQuery,
-    user_row: Optional[UserModel],
+    lang_code: str,
     db: DB,
 ) -> None:
     await callback.answer()
-    lang_code = user_language(user_row, callback.from_user)
-    category = (callback.data or "").split(":")[-1]
+    category = (callback.data or "").rpartition(":")[2]
     deeds = await db.good_deeds.list_public_good_deeds(
         statuses=PUBLIC_STATUSES,
         approved_category=category,
@@ -318,50 +385,39 @@ async def handle_good_deeds_category_list(
     if not deeds:
         await callback.message.answer(get_text("good_deeds.list.empty", lang_code))
         return
-    text = f"{APPROVED_CATEGORY_LABELS.get(category, category)}:\n\n" + "\n".join(
-        f"{idx + 1}. {_deed_brief(deed)}" for idx, deed in enumerate(deeds)
-    )
+    text = f"{APPROVED_CATEGORY_LABELS.get(category, category)}:\n\n" + _numbered_lines(deeds, _deed_brief)
     await callback.message.answer(text, reply_markup=_build_list_keyboard(deeds, "good_deeds:view"))
 
 
 @router.callback_query(F.data == "good_deeds:needy")
 async def handle_needy_list(
     callback: CallbackQuery,
-    user_row: Optional[UserModel],
+    lang_code: str,
     db: DB,
 ) -> None:
     await callback.answer()
-    lang_code = user_language(user_row, callback.from_user)
     needy = await db.good_deeds.list_needy(statuses=("approved",), limit=15)
     if not needy:
         await callback.message.answer(get_text("good_deeds.needy.empty", lang_code))
     else:
-        text = "🫶 Нуждающиеся:\n\n" + "\n".join(
-            f"{idx + 1}. {_needy_brief(item)}" for idx, item in enumerate(needy)
-        )
+        text = "🫶 Нуждающиеся:\n\n" + _numbered_lines(needy, _needy_brief)
         keyboard = _build_list_keyboard(needy, "good_deeds:needy:view")
         await callback.message.answer(text, reply_markup=keyboard)
     await callback.message.answer(
         get_text("good_deeds.needy.add.prompt", lang_code),
-        reply_markup=InlineKeyboardMarkup(
-            inline_keyboard=[
-                [InlineKeyboardButton(text="➕ Добавить нуждающегося", callback_data="good_deeds:needy:add")],
-                [InlineKeyboardButton(text="↩️ Назад", callback_data="menu:menu.good_deeds")],
-            ]
-        ),
+        reply_markup=_NEEDY_ADD_KB,
     )
 
 
 @router.callback_query(F.data.startswith("good_deeds:needy:view:"))
 async def handle_needy_view(
     callback: CallbackQuery,
-    user_row: Optional[UserModel],
+    lang_code: str,
     db: DB,
 ) -> None:
     await callback.answer()
-    lang_code = user_language(user_row, callback.from_user)
     try:
-        needy_id = int((callback.data or "").split(":")[-1])
+        needy_id = int((callback.data or "").rpartition(":")[2])
     except ValueError:
         await callback.message.answer(get_text("error.request.invalid", lang_code))
         return
@@ -391,9 +447,7 @@ async def handle_needy_view(
     )
     await callback.message.answer(
         text,
-        reply_markup=InlineKeyboardMarkup(
-            inline_keyboard=[[InlineKeyboardButton(text="↩️ Назад", callback_data="menu:menu.good_deeds")]]
-        ),
+        reply_markup=_BACK_ONLY_KB,
     )
 
 
@@ -401,10 +455,9 @@ async def handle_needy_view(
 async def handle_good_deed_add_start(
     callback: CallbackQuery,
     state: FSMContext,
-    user_row: Optional[UserModel],
+    lang_code: str,
 ) -> None:
     await callback.answer()
-    lang_code = user_language(user_row, callback.from_user)
     await state.clear()
     await state.set_state(GoodDeedCreateFlow.waiting_for_title)
     await callback.message.answer(get_text("good_deeds.prompt.title", lang_code))
@@ -414,16 +467,10 @@ async def handle_good_deed_add_start(
 async def handle_good_deed_title(
     message: Message,
     state: FSMContext,
-    user_row: Optional[UserModel],
+    lang_code: str,
 ) -> None:
-    lang_code = user_language(user_row, message.from_user)
-    if is_cancel_command(message.text):
-        await state.clear()
-        await message.answer(get_text("good_deeds.cancelled", lang_code))
-        return
-    title = (message.text or "").strip()
-    if not title:
-        await message.answer(get_text("good_deeds.prompt.title", lang_code))
+    title = await _read_text(message, state, lang_code, "good_deeds.prompt.title")
+    if title is None:
         return
     await state.update_data(title=title)
     await state.set_state(GoodDeedCreateFlow.waiting_for_description)
@@ -434,16 +481,10 @@ async def handle_good_deed_title(
 async def handle_good_deed_description(
     message: Message,
     state: FSMContext,
-    user_row: Optional[UserModel],
+    lang_code: str,
 ) -> None:
-    lang_code = user_language(user_row, message.from_user)
-    if is_cancel_command(message.text):
-        await state.clear()
-        await message.answer(get_text("good_deeds.cancelled", lang_code))
-        return
-    description = (message.text or "").strip()
-    if not description:
-        await message.answer(get_text("good_deeds.prompt.description", lang_code))
+    description = await _read_text(message, state, lang_code, "good_deeds.prompt.description")
+    if description is None:
         return
     await state.update_data(description=description)
     await state.set_state(GoodDeedCreateFlow.waiting_for_city)
@@ -454,16 +495,10 @@ async def handle_good_deed_description(
 async def handle_good_deed_city(
     message: Message,
     state: FSMContext,
-    user_row: Optional[UserModel],
+    lang_code: str,
 ) -> None:
-    lang_code = user_language(user_row, message.from_user)
-    if is_cancel_command(message.text):
-        await state.clear()
-        await message.answer(get_text("good_deeds.cancelled", lang_code))
-        return
-    city = (message.text or "").strip()
-    if not city:
-        await message.answer(get_text("good_deeds.prompt.city", lang_code))
+    city = await _read_text(message, state, lang_code, "good_deeds.prompt.city")
+    if city is None:
         return
     await state.update_data(city=city)
     await state.set_state(GoodDeedCreateFlow.waiting_for_country)
@@ -474,31 +509,24 @@ async def handle_good_deed_city(
 async def handle_good_deed_country(
     message: Message,
     state: FSMContext,
-    user_row: Optional[UserModel],
+    lang_code: str,
 ) -> None:
-    lang_code = user_language(user_row, message.from_user)
-    if is_cancel_command(message.text):
-        await state.clear()
-        await message.answer(get_text("good_deeds.cancelled", lang_code))
-        return
-    country = (message.text or "").strip()
-    if not country:
-        await message.answer(get_text("good_deeds.prompt.country", lang_code))
+    country = await _read_text(message, state, lang_code, "good_deeds.prompt.country")
+    if country is None:
         return
     await state.update_data(country=country)
     await state.set_state(GoodDeedCreateFlow.waiting_for_help_type)
-    await message.answer(get_text("good_deeds.prompt.type", lang_code), reply_markup=_build_help_type_keyboard())
+    await message.answer(get_text("good_deeds.prompt.type", lang_code), reply_markup=_HELP_TYPE_KB)
 
 
 @router.callback_query(GoodDeedCreateFlow.waiting_for_help_type, F.data.startswith("good_deeds:type:"))
 async def handle_good_deed_help_type(
     callback: CallbackQuery,
     state: FSMContext,
-    user_row: Optional[UserModel],
+    lang_code: str,
 ) -> None:
     await callback.answer()
-    lang_code = user_language(user_row, callback.from_user)
-    help_type = (callback.data or "").split(":")[-1]
+    help_type = (callback.data or "").rpartition(":")[2]
     if help_type not in HELP_TYPE_LABELS:
         await callback.message.answer(get_text("good_deeds.prompt.type", lang_code))
         return
@@ -511,9 +539,8 @@ async def handle_good_deed_help_type(
 async def handle_good_deed_amount(
     message: Message,
     state: FSMContext,
-    user_row: Optional[UserModel],
+    lang_code: str,
 ) -> None:
-    lang_code = user_language(user_row, message.from_user)
     if is_cancel_command(message.text):
         await state.clear()
         await message.answer(get_text("good_deeds.cancelled", lang_code))
@@ -528,9 +555,8 @@ async def handle_good_deed_amount(
 async def handle_good_deed_comment(
     message: Message,
     state: FSMContext,
-    user_row: Optional[UserModel],
+    lang_code: str,
 ) -> None:
-    lang_code = user_language(user_row, message.from_user)
     if is_cancel_command(message.text):
         await state.clear()
         await message.answer(get_text("good_deeds.cancelled", lang_code))
@@ -538,8 +564,7 @@ async def handle_good_deed_comment(
     comment = (message.text or "").strip()
     if comment == "-":
         comment = ""
-    await state.update_data(comment=comment)
-    data = await state.get_data()
+    data = await state.update_data(comment=comment)
     summary = (
         "Проверьте данные:\n\n"
         f"Название: {data.get('title')}\n"
@@ -553,12 +578,7 @@ async def handle_good_deed_comment(
     await state.set_state(GoodDeedCreateFlow.waiting_for_confirm)
     await message.answer(
         summary,
-        reply_markup=InlineKeyboardMarkup(
-            inline_keyboard=[
-                [InlineKeyboardButton(text="✅ Отправить на проверку", callback_data="good_deeds:submit")],
-                [InlineKeyboardButton(text="❌ Отмена", callback_data="good_deeds:cancel")],
-            ]
-        ),
+        reply_markup=_DEED_CONFIRM_KB,
     )
 
 
@@ -566,10 +586,9 @@ async def handle_good_deed_comment(
 async def handle_good_deed_cancel(
     callback: CallbackQuery,
     state: FSMContext,
-    user_row: Optional[UserModel],
+    lang_code: str,
 ) -> None:
     await callback.answer()
-    lang_code = user_language(user_row, callback.from_user)
     await state.clear()
     await callback.message.answer(get_text("good_deeds.cancelled", lang_code))
 
@@ -578,11 +597,10 @@ async def handle_good_deed_cancel(
 async def handle_good_deed_submit(
     callback: CallbackQuery,
     state: FSMContext,
-    user_row: Optional[UserModel],
+    lang_code: str,
     db: DB,
 ) -> None:
     await callback.answer()
-    lang_code = user_language(user_row, callback.from_user)
     data = await state.get_data()
     history_event = {
         "at": GoodDeedsTable.now_ts().isoformat(),
@@ -605,9 +623,7 @@ async def handle_good_deed_submit(
     await state.clear()
     await callback.message.answer(
         get_text("good_deeds.created", lang_code, deed_id=deed.get("id") or ""),
-        reply_markup=InlineKeyboardMarkup(
-            inline_keyboard=[[InlineKeyboardButton(text="↩️ Назад", callback_data="menu:menu.good_deeds")]]
-        ),
+        reply_markup=_BACK_ONLY_KB,
     )
 
 
@@ -615,20 +631,14 @@ async def handle_good_deed_submit(
 async def handle_needy_add_start(
     callback: CallbackQuery,
     state: FSMContext,
-    user_row: Optional[UserModel],
+    lang_code: str,
 ) -> None:
     await callback.answer()
-    lang_code = user_language(user_row, callback.from_user)
     await state.clear()
     await state.set_state(GoodDeedNeedyFlow.waiting_for_person_type)
     await callback.message.answer(
         get_text("good_deeds.needy.prompt.type", lang_code),
-        reply_markup=InlineKeyboardMarkup(
-            inline_keyboard=[
-                [InlineKeyboardButton(text="🙋 Человек", callback_data="good_deeds:needy:type:person")],
-                [InlineKeyboardButton(text="👨‍👩‍👧‍👦 Семья", callback_data="good_deeds:needy:type:family")],
-            ]
-        ),
+        reply_markup=_PERSON_TYPE_KB,
     )
 
 
@@ -636,12 +646,11 @@ async def handle_needy_add_start(
 async def handle_needy_type(
     callback: CallbackQuery,
     state: FSMContext,
-    user_row: Optional[UserModel],
+    lang_code: str,
 ) -> None:
     await callback.answer()
-    lang_code = user_language(user_row, callback.from_user)
-    person_type = (callback.data or "").split(":")[-1]
-    if person_type not in {"person", "family"}:
+    person_type = (callback.data or "").rpartition(":")[2]
+    if person_type not in _PERSON_TYPES:
         await callback.message.answer(get_text("good_deeds.needy.prompt.type", lang_code))
         return
     await state.update_data(person_type="Человек" if person_type == "person" else "Семья")
@@ -653,16 +662,10 @@ async def handle_needy_type(
 async def handle_needy_city(
     message: Message,
     state: FSMContext,
-    user_row: Optional[UserModel],
+    lang_code: str,
 ) -> None:
-    lang_code = user_language(user_row, message.from_user)
-    if is_cancel_command(message.text):
-        await state.clear()
-        await message.answer(get_text("good_deeds.cancelled", lang_code))
-        return
-    city = (message.text or "").strip()
-    if not city:
-        await message.answer(get_text("good_deeds.needy.prompt.city", lang_code))
+    city = await _read_text(message, state, lang_code, "good_deeds.needy.prompt.city")
+    if city is None:
         return
     await state.update_data(city=city)
     await state.set_state(GoodDeedNeedyFlow.waiting_for_country)
@@ -673,16 +676,10 @@ async def handle_needy_city(
 async def handle_needy_country(
     message: Message,
     state: FSMContext,
-    user_row: Optional[UserModel],
+    lang_code: str,
 ) -> None:
-    lang_code = user_language(user_row, message.from_user)
-    if is_cancel_command(message.text):
-        await state.clear()
-        await message.answer(get_text("good_deeds.cancelled", lang_code))
-        return
-    country = (message.text or "").strip()
-    if not country:
-        await message.answer(get_text("good_deeds.needy.prompt.country", lang_code))
+    country = await _read_text(message, state, lang_code, "good_deeds.needy.prompt.country")
+    if country is None:
         return
     await state.update_data(country=country)
     await state.set_state(GoodDeedNeedyFlow.waiting_for_reason)
@@ -693,27 +690,16 @@ async def handle_needy_country(
 async def handle_needy_reason(
     message: Message,
     state: FSMContext,
-    user_row: Optional[UserModel],
+    lang_code: str,
 ) -> None:
-    lang_code = user_language(user_row, message.from_user)
-    if is_cancel_command(message.text):
-        await state.clear()
-        await message.answer(get_text("good_deeds.cancelled", lang_code))
-        return
-    reason = (message.text or "").strip()
-    if not reason:
-        await message.answer(get_text("good_deeds.needy.prompt.reason", lang_code))
+    reason = await _read_text(message, state, lang_code, "good_deeds.needy.prompt.reason")
+    if reason is None:
         return
     await state.update_data(reason=reason)
     await state.set_state(GoodDeedNeedyFlow.waiting_for_zakat)
     await message.answer(
         get_text("good_deeds.needy.prompt.zakat", lang_code),
-        reply_markup=InlineKeyboardMarkup(
-            inline_keyboard=[
-                [InlineKeyboardButton(text="✅ Да", callback_data="good_deeds:needy:zakat:yes")],
-                [InlineKeyboardButton(text="❌ Нет", callback_data="good_deeds:needy:zakat:no")],
-            ]
-        ),
+        reply_markup=_ZAKAT_KB,
     )
 
 
@@ -721,24 +707,18 @@ async def handle_needy_reason(
 async def handle_needy_zakat(
     callback: CallbackQuery,
     state: FSMContext,
-    user_row: Optional[UserModel],
+    lang_code: str,
 ) -> None:
     await callback.answer()
-    lang_code = user_language(user_row, callback.from_user)
-    value = (callback.data or "").split(":")[-1]
-    if value not in {"yes", "no"}:
+    value = (callback.data or "").rpartition(":")[2]
+    if value not in _YES_NO:
         await callback.message.answer(get_text("good_deeds.needy.prompt.zakat", lang_code))
         return
     await state.update_data(allow_zakat=value == "yes")
     await state.set_state(GoodDeedNeedyFlow.waiting_for_fitr)
     await callback.message.answer(
         get_text("good_deeds.needy.prompt.fitr", lang_code),
-        reply_markup=InlineKeyboardMarkup(
-            inline_keyboard=[
-                [InlineKeyboardButton(text="✅ Да", callback_data="good_deeds:needy:fitr:yes")],
-                [InlineKeyboardButton(text="❌ Нет", callback_data="good_deeds:needy:fitr:no")],
-            ]
-        ),
+        reply_markup=_FITR_KB,
     )
 
 
@@ -746,12 +726,11 @@ async def handle_needy_zakat(
 async def handle_needy_fitr(
     callback: CallbackQuery,
     state: FSMContext,
-    user_row: Optional[UserModel],
+    lang_code: str,
 ) -> None:
     await callback.answer()
-    lang_code = user_language(user_row, callback.from_user)
-    value = (callback.data or "").split(":")[-1]
-    if value not in {"yes", "no"}:
+    value = (callback.data or "").rpartition(":")[2]
+    if value not in _YES_NO:
         await callback.message.answer(get_text("good_deeds.needy.prompt.fitr", lang_code))
         return
     await state.update_data(allow_fitr=value == "yes")
@@ -763,9 +742,8 @@ async def handle_needy_fitr(
 async def handle_needy_comment(
     message: Message,
     state: FSMContext,
-    user_row: Optional[UserModel],
+    lang_code: str,
 ) -> None:
-    lang_code = user_language(user_row, message.from_user)
     if is_cancel_command(message.text):
         await state.clear()
         await message.answer(get_text("good_deeds.cancelled", lang_code))
@@ -773,12 +751,12 @@ async def handle_needy_comment(
     comment = (message.text or "").strip()
     if comment == "-":
         comment = ""
-    await state.update_data(comment=comment)
     data = await state.get_data()
     allow_zakat = bool(data.get("allow_zakat"))
     allow_fitr = bool(data.get("allow_fitr"))
     sadaqa_only = not allow_zakat and not allow_fitr
-    await state.update_data(sadaqa_only=sadaqa_only)
+    data = {**data, "comment": comment, "sadaqa_only": sadaqa_only}
+    await state.set_data(data)
     summary = (
         "Проверьте данные:\n\n"
         f"Тип: {data.get('person_type')}\n"
@@ -793,12 +771,7 @@ async def handle_needy_comment(
     await state.set_state(GoodDeedNeedyFlow.waiting_for_confirm)
     await message.answer(
         summary,
-        reply_markup=InlineKeyboardMarkup(
-            inline_keyboard=[
-                [InlineKeyboardButton(text="✅ Отправить на проверку", callback_data="good_deeds:needy:submit")],
-                [InlineKeyboardButton(text="❌ Отмена", callback_data="good_deeds:cancel")],
-            ]
-        ),
+        reply_markup=_NEEDY_CONFIRM_KB,
     )
 
 
@@ -806,11 +779,10 @@ async def handle_needy_comment(
 async def handle_needy_submit(
     callback: CallbackQuery,
     state: FSMContext,
-    user_row: Optional[UserModel],
+    lang_code: str,
     db: DB,
 ) -> None:
     await callback.answer()
-    lang_code = user_language(user_row, callback.from_user)
     data = await state.get_data()
     history_event = {
         "at": GoodDeedsTable.now_ts().isoformat(),
@@ -834,9 +806,7 @@ async def handle_needy_submit(
     await state.clear()
     await callback.message.answer(
         get_text("good_deeds.needy.created", lang_code),
-        reply_markup=InlineKeyboardMarkup(
-            inline_keyboard=[[InlineKeyboardButton(text="↩️ Назад", callback_data="menu:menu.good_deeds")]]
-        ),
+        reply_markup=_BACK_ONLY_KB,
     )
 
 
@@ -844,10 +814,9 @@ async def handle_needy_submit(
 async def handle_needy_cancel(
     callback: CallbackQuery,
     state: FSMContext,
-    user_row: Optional[UserModel],
+    lang_code: str,
 ) -> None:
     await callback.answer()
-    lang_code = user_language(user_row, callback.from_user)
     await state.clear()
     await callback.message.answer(get_text("good_deeds.cancelled", lang_code))
 
@@ -856,27 +825,24 @@ async def handle_needy_cancel(
 async def handle_good_deed_confirm_start(
     callback: CallbackQuery,
     state: FSMContext,
-    user_row: Optional[UserModel],
+    lang_code: str,
     db: DB,
 ) -> None:
     await callback.answer()
-    lang_code = user_language(user_row, callback.from_user)
     try:
-        deed_id = int((callback.data or "").split(":")[-1])
+        deed_id = int((callback.data or "").rpartition(":")[2])
     except ValueError:
         await callback.message.answer(get_text("error.request.invalid", lang_code))
         return
-    deed = await db.good_deeds.get_good_deed_by_id(good_deed_id=deed_id)
+    deed = await db.good_deeds.get_good_deed_access(good_deed_id=deed_id)
     if not deed:
         await callback.message.answer(get_text("error.request.invalid", lang_code))
         return
     status = str(deed.get("status") or "")
-    if status not in {"approved", "in_progress"}:
+    if status not in _OPEN_DEED_STATUSES:
         await callback.message.answer(get_text("good_deeds.confirm.not_allowed", lang_code))
         return
-    await state.clear()
-    await state.set_state(GoodDeedConfirmationFlow.waiting_for_text)
-    await state.update_data(good_deed_id=deed_id)
+    await restart_state(state, GoodDeedConfirmationFlow.waiting_for_text, good_deed_id=deed_id)
     await callback.message.answer(get_text("good_deeds.confirm.prompt.text", lang_code))
 
 
@@ -884,16 +850,10 @@ async def handle_good_deed_confirm_start(
 async def handle_good_deed_confirm_text(
     message: Message,
     state: FSMContext,
-    user_row: Optional[UserModel],
+    lang_code: str,
 ) -> None:
-    lang_code = user_language(user_row, message.from_user)
-    if is_cancel_command(message.text):
-        await state.clear()
-        await message.answer(get_text("good_deeds.cancelled", lang_code))
-        return
-    text = (message.text or "").strip()
-    if not text:
-        await message.answer(get_text("good_deeds.confirm.prompt.text", lang_code))
+    text = await _read_text(message, state, lang_code, "good_deeds.confirm.prompt.text")
+    if text is None:
         return
     await state.update_data(text=text)
     await state.set_state(GoodDeedConfirmationFlow.waiting_for_attachment)
@@ -904,10 +864,9 @@ async def handle_good_deed_confirm_text(
 async def handle_good_deed_confirm_attachment(
     message: Message,
     state: FSMContext,
-    user_row: Optional[UserModel],
+    lang_code: str,
     db: DB,
 ) -> None:
-    lang_code = user_language(user_row, message.from_user)
     if is_cancel_command(message.text):
         await state.clear()
         await message.answer(get_text("good_deeds.cancelled", lang_code))
@@ -957,19 +916,12 @@ async def handle_good_deed_confirm_attachment(
         await state.clear()
         await message.answer(get_text("good_deeds.confirm.error", lang_code))
         return
-    await db.good_deeds.create_confirmation(
+    await db.good_deeds.submit_confirmation(
         good_deed_id=good_deed_id,
         created_by_user_id=message.from_user.id,
         text=str(data.get("text") or ""),
         attachment=attachment,
-        status="pending",
-    )
-    await db.good_deeds.update_good_deed_status(
-        good_deed_id=good_deed_id,
-        status="in_progress",
-    )
-    await db.good_deeds.append_good_deed_history(
-        good_deed_id=good_deed_id,
+        deed_status="in_progress",
         event={
             "at": GoodDeedsTable.now_ts().isoformat(),
             "action": "confirmation_submitted",
@@ -985,26 +937,23 @@ async def handle_good_deed_confirm_attachment(
 async def handle_good_deed_clarify_start(
     callback: CallbackQuery,
     state: FSMContext,
-    user_row: Optional[UserModel],
+    lang_code: str,
     db: DB,
 ) -> None:
     await callback.answer()
-    lang_code = user_language(user_row, callback.from_user)
     try:
-        deed_id = int((callback.data or "").split(":")[-1])
+        deed_id = int((callback.data or "").rpartition(":")[2])
     except ValueError:
         await callback.message.answer(get_text("error.request.invalid", lang_code))
         return
-    deed = await db.good_deeds.get_good_deed_by_id(good_deed_id=deed_id)
+    deed = await db.good_deeds.get_good_deed_access(good_deed_id=deed_id)
     if not deed:
         await callback.message.answer(get_text("error.request.invalid", lang_code))
         return
     if int(deed.get("user_id") or 0) != callback.from_user.id:
         await callback.message.answer(get_text("good_deeds.confirm.not_allowed", lang_code))
         return
-    await state.clear()
-    await state.set_state(GoodDeedClarifyFlow.waiting_for_text)
-    await state.update_data(good_deed_id=deed_id)
+    await restart_state(state, GoodDeedClarifyFlow.waiting_for_text, good_deed_id=deed_id)
     await callback.message.answer(get_text("good_deeds.clarify.prompt.text", lang_code))
 
 
@@ -1012,16 +961,10 @@ async def handle_good_deed_clarify_start(
 async def handle_good_deed_clarify_text(
     message: Message,
     state: FSMContext,
-    user_row: Optional[UserModel],
+    lang_code: str,
 ) -> None:
-    lang_code = user_language(user_row, message.from_user)
-    if is_cancel_command(message.text):
-        await state.clear()
-        await message.answer(get_text("good_deeds.cancelled", lang_code))
-        return
-    text = (message.text or "").strip()
-    if not text:
-        await message.answer(get_text("good_deeds.clarify.prompt.text", lang_code))
+    text = await _read_text(message, state, lang_code, "good_deeds.clarify.prompt.text")
+    if text is None:
         return
     await state.update_data(text=text)
     await state.set_state(GoodDeedClarifyFlow.waiting_for_attachment)
@@ -1032,10 +975,9 @@ async def handle_good_deed_clarify_text(
 async def handle_good_deed_clarify_attachment(
     message: Message,
     state: FSMContext,
-    user_row: Optional[UserModel],
+    lang_code: str,
     db: DB,
 ) -> None:
-    lang_code = user_language(user_row, message.from_user)
     if is_cancel_command(message.text):
         await state.clear()
         await message.answer(get_text("good_deeds.cancelled", lang_code))
@@ -1085,18 +1027,11 @@ async def handle_good_deed_clarify_attachment(
         await state.clear()
         await message.answer(get_text("good_deeds.confirm.error", lang_code))
         return
-    await db.good_deeds.update_good_deed_clarification(
+    await db.good_deeds.submit_clarification(
         good_deed_id=good_deed_id,
         text=str(data.get("text") or ""),
         attachment=attachment,
-    )
-    await db.good_deeds.update_good_deed_status(
-        good_deed_id=good_deed_id,
         status="pending",
-        review_comment=None,
-    )
-    await db.good_deeds.append_good_deed_history(
-        good_deed_id=good_deed_id,
         event={
             "at": GoodDeedsTable.now_ts().isoformat(),
             "action": "clarification_sent",
@@ -43,6 +43,7 @@ from app.services.scholar_requests.service import (
     build_request_payload,
     build_request_summary,
     forward_request_to_group,
+    new_request_id,
     persist_request_to_documents,
 )
 from app.services.work_items.service import create_work_item
@@ -1332,7 +1333,7 @@ async def handle_inheritance_ask_submit(
     data = await state.get_data()
     attachments = inheritance_scholar_attachments.get(callback.from_user.id) or []
 
-    request_id = uuid.uuid4().int % 100000
+    request_id = new_request_id()
     request_type = str(data.get("ask_type") or "text").strip().lower()
     if request_type not in {"video", "text", "docs"}:
         request_type = "text"
@@ -28,6 +28,7 @@ from app.services.scholar_requests.service import (
     build_request_payload,
     build_request_summary,
     forward_request_to_group,
+    new_request_id,
     persist_request_to_documents,
 )
 from app.services.work_items.service import create_work_item
@@ -1070,7 +1071,7 @@ async def _submit_scholar_request(
     data: dict[str, Any],
     attachments: List[ScholarAttachment],
 ) -> bool:
-    request_id = uuid.uuid4().int % 100000
+    request_id = new_request_id()
     draft = ScholarRequestDraft(
         request_type=request_type,  # type: ignore[arg-type]
         data=dict(data),
@@ -6,6 +6,7 @@ from aiogram.types import Update, User
 
 from app.infrastructure.database.db import DB
 from app.infrastructure.database.models.user import UserModel
+from app.services.i18n.localization import resolve_language
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +31,11 @@ class GetUserMiddleware(BaseMiddleware):
 
         user_row: UserModel | None = await db.users.get_user(user_id=user.id)
 
-        data.update(user_row=user_row)
+        # Resolved once per update so handlers can take `lang_code` directly.
+        lang_code = resolve_language(
+            getattr(user_row, "language_code", None),
+            getattr(user, "language_code", None),
+        )
+        data.update(user_row=user_row, lang_code=lang_code)
 
         return await handler(event, data)
@@ -0,0 +1,32 @@
+import asyncio
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.methods import GetUpdates, Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+
+
+class RequestConcurrencyMiddleware(BaseRequestMiddleware):
+    """
+    Caps the number of Bot API requests in flight across all handlers.
+
+    Fan-out code can then schedule sends concurrently without exceeding
+    Telegram's global rate limits; long-polling GetUpdates is not counted.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self._semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        if isinstance(method, GetUpdates):
+            return await make_request(bot, method)
+        async with self._semaphore:
+            return await make_request(bot, method)
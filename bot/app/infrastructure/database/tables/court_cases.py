@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+import copy
 import json
+import time
+from collections import OrderedDict
 from datetime import datetime
 from decimal import Decimal
 from typing import Any, Iterable, Optional
@@ -8,6 +11,54 @@ from typing import Any, Iterable, Optional
 from app.infrastructure.database.tables.base import BaseTable
 from app.infrastructure.database.query.results import MultipleQueryResult, SingleQueryResult
 
+# get_case_by_id is hit on every case button and mediate message. Rows are cached
+# briefly by id (shared by the per-update table instances) and every write through
+# this table drops the entry; writes from other processes (the admin backend) show
+# up after the TTL. Cached rows may therefore be stale, so writes that must not
+# touch closed cases re-check the status in their own WHERE clause.
+_CASE_CACHE_TTL_SEC = 30.0
+_CASE_CACHE_MAX = 2048
+_case_cache: OrderedDict[int, tuple[float, dict[str, Any]]] = OrderedDict()
+# Bumped by every invalidation so a read that raced a write does not re-cache its old row.
+_case_cache_epoch = 0
+_OPEN_CASE_SQL = "lower(COALESCE(status, '')) NOT IN ('closed', 'cancelled')"
+
+
+def _cached_case(case_id: int) -> dict[str, Any] | None:
+    entry = _case_cache.get(case_id)
+    if entry is None:
+        return None
+    expires_at, row = entry
+    if time.monotonic() >= expires_at:
+        del _case_cache[case_id]
+        return None
+    _case_cache.move_to_end(case_id)
+    return row
+
+
+def _remember_case(row: dict[str, Any], epoch: int) -> None:
+    if epoch != _case_cache_epoch:
+        return
+    case_id = int(row.get("id") or 0)
+    _case_cache[case_id] = (time.monotonic() + _CASE_CACHE_TTL_SEC, row)
+    _case_cache.move_to_end(case_id)
+    if len(_case_cache) > _CASE_CACHE_MAX:
+        _case_cache.popitem(last=False)
+
+
+def invalidate_case(case_id: int) -> None:
+    global _case_cache_epoch
+    _case_cache_epoch += 1
+    _case_cache.pop(case_id, None)
+
+
+def _is_case_member(row: dict[str, Any], user_id: int) -> bool:
+    # Mirrors the membership filter in get_case_by_id's SQL.
+    return (
+        user_id in (row.get("participants") or ())
+        or user_id in (row.get("user_id"), row.get("plaintiff_id"), row.get("defendant_id"))
+    )
+
 
 class CourtCasesTable(BaseTable):
     __tablename__ = "court_cases"
@@ -77,7 +128,30 @@ class CourtCasesTable(BaseTable):
             sql="ALTER TABLE court_cases ADD COLUMN IF NOT EXISTS mediate_log JSONB DEFAULT '[]'::jsonb"
         )
         await self.connection.execute(
-            sql="CREATE INDEX IF NOT EXISTS idx_court_cases_invite_code ON court_cases(invite_code)"
+            sql="DROP INDEX IF EXISTS idx_court_cases_invite_code"
+        )
+        # The old lookup-then-insert could hand one code to two cases; keep it on the
+        # oldest case so the unique index below can be built.
+        await self.connection.execute(
+            sql=(
+                """
+                UPDATE court_cases AS c
+                SET invite_code = NULL
+                WHERE c.invite_code IS NOT NULL
+                  AND EXISTS (
+                    SELECT 1
+                    FROM court_cases AS d
+                    WHERE d.invite_code = c.invite_code
+                      AND d.id < c.id
+                  )
+                """
+            )
+        )
+        await self.connection.execute(
+            sql=(
+                "CREATE UNIQUE INDEX IF NOT EXISTS idx_court_cases_invite_code_unique "
+                "ON court_cases(invite_code)"
+            )
         )
         await self.connection.execute(
             sql=(
@@ -114,7 +188,9 @@ class CourtCasesTable(BaseTable):
         status: str = "open",
         scholar_id: str | None = None,
         sent_to_scholar: bool = False,
-    ) -> dict[str, Any]:
+    ) -> dict[str, Any] | None:
+        # Returns None when invite_code is already taken so the caller can retry
+        # with a fresh code; NULL codes never conflict.
         result: SingleQueryResult = await self.connection.insert_and_fetchone(
             sql=(
                 """
@@ -124,6 +200,7 @@ class CourtCasesTable(BaseTable):
                     sent_to_scholar, scholar_id
                 )
                 VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
+                ON CONFLICT (invite_code) DO NOTHING
                 RETURNING id, created_at
                 """
             ),
@@ -145,6 +222,8 @@ class CourtCasesTable(BaseTable):
                 scholar_id,
             ),
         )
+        if result.is_empty():
+            return None
         row = result.as_dict()
         case_id = int(row.get("id") or 0)
         year = datetime.utcnow().year
@@ -168,6 +247,13 @@ class CourtCasesTable(BaseTable):
         case_id: int,
         user_id: Optional[int] = None,
     ) -> dict[str, Any] | None:
+        cached = _cached_case(case_id)
+        if cached is not None:
+            if user_id is not None and not _is_case_member(cached, user_id):
+                return None
+            # Handlers annotate the returned dict and its lists, so each caller gets its own copy.
+            return copy.deepcopy(cached)
+        epoch = _case_cache_epoch
         if user_id is None:
             result: SingleQueryResult = await self.connection.fetchone(
                 sql="SELECT * FROM court_cases WHERE id = %s",
@@ -192,7 +278,9 @@ class CourtCasesTable(BaseTable):
             )
         if result.is_empty():
             return None
-        return result.as_dict()
+        row = result.as_dict()
+        _remember_case(row, epoch)
+        return copy.deepcopy(row)
 
     async def list_cases_by_status(
         self,
@@ -254,6 +342,7 @@ class CourtCasesTable(BaseTable):
             ),
             params=(defendant_id, defendant_id, defendant_id, case_id),
         )
+        invalidate_case(case_id)
         if result.is_empty():
             return None
         return result.as_dict()
@@ -266,15 +355,16 @@ class CourtCasesTable(BaseTable):
     ) -> dict[str, Any] | None:
         result: SingleQueryResult = await self.connection.update_and_fetchone(
             sql=(
-                """
+                f"""
                 UPDATE court_cases
                 SET claim = %s, updated_at = NOW()
-                WHERE id = %s
+                WHERE id = %s AND {_OPEN_CASE_SQL}
                 RETURNING *
                 """
             ),
             params=(claim, case_id),
         )
+        invalidate_case(case_id)
         if result.is_empty():
             return None
         return result.as_dict()
@@ -287,15 +377,16 @@ class CourtCasesTable(BaseTable):
     ) -> dict[str, Any] | None:
         result: SingleQueryResult = await self.connection.update_and_fetchone(
             sql=(
-                """
+                f"""
                 UPDATE court_cases
                 SET category = %s, updated_at = NOW()
-                WHERE id = %s
+                WHERE id = %s AND {_OPEN_CASE_SQL}
                 RETURNING *
                 """
             ),
             params=(category, case_id),
         )
+        invalidate_case(case_id)
         if result.is_empty():
             return None
         return result.as_dict()
@@ -308,15 +399,16 @@ class CourtCasesTable(BaseTable):
     ) -> dict[str, Any] | None:
         result: SingleQueryResult = await self.connection.update_and_fetchone(
             sql=(
-                """
+                f"""
                 UPDATE court_cases
                 SET status = %s, updated_at = NOW()
-                WHERE id = %s
+                WHERE id = %s AND {_OPEN_CASE_SQL}
                 RETURNING *
                 """
             ),
             params=(status, case_id),
         )
+        invalidate_case(case_id)
         if result.is_empty():
             return None
         return result.as_dict()
@@ -338,29 +430,57 @@ class CourtCasesTable(BaseTable):
             ),
             params=(sent, case_id),
         )
+        invalidate_case(case_id)
         if result.is_empty():
             return None
         return result.as_dict()
 
+    async def claim_scholar_send(self, *, case_id: int) -> bool:
+        # Set the flag before forwarding so a second tap cannot send the case twice;
+        # False means another send already claimed it.
+        result: SingleQueryResult = await self.connection.update_and_fetchone(
+            sql=(
+                """
+                UPDATE court_cases
+                SET sent_to_scholar = TRUE, updated_at = NOW()
+                WHERE id = %s AND NOT COALESCE(sent_to_scholar, FALSE)
+                RETURNING id
+                """
+            ),
+            params=(case_id,),
+        )
+        invalidate_case(case_id)
+        return not result.is_empty()
+
     async def append_evidence(
         self,
         *,
         case_id: int,
         evidence_item: dict[str, Any],
+        limit: int | None = None,
     ) -> dict[str, Any] | None:
+        # The append happens server-side, so concurrent uploads from both parties
+        # cannot overwrite each other. A closed case, or a full one when a limit
+        # is given, returns None.
         payload = json.dumps([evidence_item], ensure_ascii=False)
+        limit_sql = ""
+        params: tuple[Any, ...] = (payload, case_id)
+        if limit is not None:
+            limit_sql = "AND jsonb_array_length(COALESCE(evidence, '[]'::jsonb)) < %s"
+            params = (payload, case_id, limit)
         result: SingleQueryResult = await self.connection.update_and_fetchone(
             sql=(
-                """
+                f"""
                 UPDATE court_cases
                 SET evidence = COALESCE(evidence, '[]'::jsonb) || %s::jsonb,
                     updated_at = NOW()
-                WHERE id = %s
+                WHERE id = %s AND {_OPEN_CASE_SQL} {limit_sql}
                 RETURNING *
                 """
             ),
-            params=(payload, case_id),
+            params=params,
         )
+        invalidate_case(case_id)
         if result.is_empty():
             return None
         return result.as_dict()
@@ -371,7 +491,17 @@ class CourtCasesTable(BaseTable):
         case_id: int,
         entry: dict[str, Any],
     ) -> None:
-        payload = json.dumps([entry], ensure_ascii=False)
+        await self.append_mediate_log_entries(case_id=case_id, entries=[entry])
+
+    async def append_mediate_log_entries(
+        self,
+        *,
+        case_id: int,
+        entries: list[dict[str, Any]],
+    ) -> None:
+        if not entries:
+            return
+        payload = json.dumps(entries, ensure_ascii=False, separators=(",", ":"))
         await self.connection.execute(
             sql=(
                 """
@@ -383,6 +513,7 @@ class CourtCasesTable(BaseTable):
             ),
             params=(payload, case_id),
         )
+        invalidate_case(case_id)
 
     async def get_mediate_log(self, *, case_id: int) -> list[dict[str, Any]]:
         result: SingleQueryResult = await self.connection.fetchone(
@@ -422,3 +553,4 @@ class CourtCasesTable(BaseTable):
             ),
             params=(case_id,),
         )
+        invalidate_case(case_id)
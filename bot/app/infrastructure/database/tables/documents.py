@@ -115,6 +115,21 @@ class DocumentsTable(BaseTable):
         )
         return result.as_dicts()
 
+    async def search_user_documents_by_name(
+        self, *, user_id: int, doc_type: str, pattern: str
+    ) -> list[dict[str, Any]]:
+        # Content is selected because every match is sent to the user as a file.
+        escaped = pattern.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        result: MultipleQueryResult = await self.connection.fetchmany(
+            sql="""
+                SELECT id, filename, user_id, category, name, content, type, contract_id
+                FROM documents
+                WHERE user_id = %s AND type = %s AND LOWER(name) LIKE LOWER(%s) ESCAPE '\\'
+            """,
+            params=(user_id, doc_type, f"%{escaped}%"),
+        )
+        return result.as_dicts()
+
     async def get_user_document_by_contract_id(
         self,
         *,
@@ -252,6 +252,33 @@ class GoodDeedsTable(BaseTable):
             params=(payload, good_deed_id),
         )
 
+    async def submit_clarification(
+        self,
+        *,
+        good_deed_id: int,
+        text: str | None,
+        attachment: dict[str, Any] | None,
+        status: str,
+        event: dict[str, Any],
+    ) -> None:
+        # Clarification, status reset and history entry in one statement instead of three.
+        payload = json.dumps(attachment, ensure_ascii=False) if attachment else None
+        await self.connection.execute(
+            sql=(
+                """
+                UPDATE good_deeds
+                SET clarification_text = %s,
+                    clarification_attachment = %s::jsonb,
+                    status = %s,
+                    review_comment = NULL,
+                    history = COALESCE(history, '[]'::jsonb) || %s::jsonb,
+                    updated_at = NOW()
+                WHERE id = %s
+                """
+            ),
+            params=(text, payload, status, json.dumps([event], ensure_ascii=False), good_deed_id),
+        )
+
     async def get_good_deed_by_id(self, *, good_deed_id: int) -> dict[str, Any] | None:
         result: SingleQueryResult = await self.connection.fetchone(
             sql="SELECT * FROM good_deeds WHERE id = %s",
@@ -261,6 +288,16 @@ class GoodDeedsTable(BaseTable):
             return None
         return result.as_dict()
 
+    async def get_good_deed_access(self, *, good_deed_id: int) -> dict[str, Any] | None:
+        # Only the columns button handlers authorize on, not the history/attachment JSONB.
+        result: SingleQueryResult = await self.connection.fetchone(
+            sql="SELECT id, user_id, status FROM good_deeds WHERE id = %s",
+            params=(good_deed_id,),
+        )
+        if result.is_empty():
+            return None
+        return result.as_dict()
+
     async def list_good_deeds_by_user(
         self,
         *,
@@ -479,6 +516,49 @@ class GoodDeedsTable(BaseTable):
         )
         return result.as_dict()
 
+    async def submit_confirmation(
+        self,
+        *,
+        good_deed_id: int,
+        created_by_user_id: int,
+        text: Optional[str],
+        attachment: dict[str, Any] | None,
+        deed_status: str,
+        event: dict[str, Any],
+    ) -> dict[str, Any]:
+        # The data-modifying CTE keeps the insert, status change and history entry
+        # atomic in a single round-trip, even on autocommit connections.
+        payload = json.dumps(attachment, ensure_ascii=False) if attachment else None
+        result: SingleQueryResult = await self.connection.insert_and_fetchone(
+            sql=(
+                """
+                WITH deed AS (
+                    UPDATE good_deeds
+                    SET status = %s,
+                        review_comment = NULL,
+                        history = COALESCE(history, '[]'::jsonb) || %s::jsonb,
+                        updated_at = NOW()
+                    WHERE id = %s
+                )
+                INSERT INTO good_deed_confirmations(
+                    good_deed_id, created_by_user_id, text, attachment, status
+                )
+                VALUES(%s,%s,%s,%s::jsonb,'pending')
+                RETURNING *
+                """
+            ),
+            params=(
+                deed_status,
+                json.dumps([event], ensure_ascii=False),
+                good_deed_id,
+                good_deed_id,
+                created_by_user_id,
+                text,
+                payload,
+            ),
+        )
+        return result.as_dict()
+
     async def list_confirmations(
         self,
         *,
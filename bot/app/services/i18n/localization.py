@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import Dict, Optional
 
 DEFAULT_LANGUAGE = "ru"
@@ -15,6 +16,7 @@ def set_runtime_language_texts(lang_code: str, mapping: Dict[str, str]) -> None:
         return
     code = lang_code.lower()
     _RUNTIME_TEXTS[code] = dict(mapping or {})
+    _template.cache_clear()
 
 # Minimal dictionaries; unknown keys fall back to the key itself.
 TEXTS_RU: Dict[str, str] = {
@@ -2651,6 +2653,7 @@ LANGUAGE_LABELS: Dict[str, Dict[str, str]] = {
 }
 
 
+@lru_cache(maxsize=256)
 def resolve_language(*codes: Optional[str]) -> str:
     for code in codes:
         if not code:
@@ -2661,28 +2664,28 @@ def resolve_language(*codes: Optional[str]) -> str:
     return DEFAULT_LANGUAGE
 
 
-def get_text(key: str, lang_code: str, **kwargs) -> str:
-    language = (lang_code or DEFAULT_LANGUAGE).lower()
+@lru_cache(maxsize=4096)
+def _template(key: str, language: str) -> str:
+    # Unformatted template for a key; cleared whenever runtime texts are replaced.
+    if language == "dev":
+        return key
     # 1) DB-backed runtime translations
-    if language != "dev":
-        db_text = _RUNTIME_TEXTS.get(language, {}).get(key)
-        if db_text is not None:
-            try:
-                return db_text.format(**kwargs) if kwargs else db_text
-            except Exception:
-                return db_text
-
+    db_text = _RUNTIME_TEXTS.get(language, {}).get(key)
+    if db_text is not None:
+        return db_text
     # 2) Built-in safe fallback
-    if language == "dev":
-        text = key
-    else:
-        text = TEXTS.get(language, {}).get(key)
-        if text is None:
-            text = (
-                TEXTS.get("en", {}).get(key)
-                or TEXTS.get(DEFAULT_LANGUAGE, {}).get(key)
-                or key
-            )
+    text = TEXTS.get(language, {}).get(key)
+    if text is None:
+        text = (
+            TEXTS.get("en", {}).get(key)
+            or TEXTS.get(DEFAULT_LANGUAGE, {}).get(key)
+            or key
+        )
+    return text
+
+
+def get_text(key: str, lang_code: str, **kwargs) -> str:
+    text = _template(key, (lang_code or DEFAULT_LANGUAGE).lower())
     try:
         return text.format(**kwargs) if kwargs else text
     except Exception:
@@ -7,6 +7,7 @@ from .service import (
     build_request_payload,
     build_request_summary,
     build_forward_text,
+    new_request_id,
     persist_request_to_documents,
     forward_request_to_group,
 )
@@ -18,6 +19,7 @@ __all__ = [
     "build_request_payload",
     "build_request_summary",
     "build_forward_text",
+    "new_request_id",
     "persist_request_to_documents",
     "forward_request_to_group",
 ]
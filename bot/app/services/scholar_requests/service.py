@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+import secrets
 import uuid
 from dataclasses import dataclass
 from typing import Any, Literal, Protocol, Sequence
@@ -9,6 +10,7 @@ from app.services.i18n.localization import get_text, resolve_language
 
 ScholarRequestType = Literal["video", "text", "docs"]
 MAX_ATTACHMENTS = 5
+REQUEST_ID_LIMIT = 100_000
 
 
 class TelegramUserLike(Protocol):
@@ -31,6 +33,10 @@ class ScholarRequestDraft:
     attachments: Sequence[ScholarAttachment]
 
 
+def new_request_id() -> int:
+    return secrets.randbelow(REQUEST_ID_LIMIT)
+
+
 def build_request_summary(draft: ScholarRequestDraft) -> str:
     request_type = draft.request_type
     data = draft.data or {}
@@ -6,11 +6,19 @@ import sys
 from app.bot import main
 from config.config import settings
 
+try:
+    import uvloop
+except ImportError:  # optional speedup, the stdlib event loop is used without it
+    uvloop = None
+
 logging.basicConfig(
     level=logging.getLevelName(settings.logs.level_name), format=settings.logs.format
 )
 
 if sys.platform.startswith("win") or os.name == "nt":
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
-
-asyncio.run(main())
+    asyncio.run(main())
+elif uvloop is not None:
+    uvloop.run(main())
+else:
+    asyncio.run(main())
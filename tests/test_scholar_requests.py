@@ -2,12 +2,15 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 
+from app.services.scholar_requests import service
 from app.services.scholar_requests.service import (
+    REQUEST_ID_LIMIT,
     ScholarAttachment,
     ScholarRequestDraft,
     build_forward_text,
     build_request_payload,
     build_request_summary,
+    new_request_id,
 )
 
 
@@ -54,3 +57,14 @@ def test_build_forward_text_contains_request_id_and_user() -> None:
     assert "#42" in text
     assert "id=321" in text
 
+
+def test_new_request_id_uses_secrets_randbelow(monkeypatch) -> None:
+    calls: list[int] = []
+
+    def fake_randbelow(limit: int) -> int:
+        calls.append(limit)
+        return 4242
+
+    monkeypatch.setattr(service.secrets, "randbelow", fake_randbelow)
+    assert new_request_id() == 4242
+    assert calls == [REQUEST_ID_LIMIT]